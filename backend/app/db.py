@@ -5,7 +5,8 @@ from sqlalchemy import (
     Float,
     String,
     Date,
-    DateTime
+    DateTime,
+    Boolean
 )
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
@@ -100,9 +101,9 @@ def prepare_nba_df_for_db(df: pd.DataFrame) -> pd.DataFrame:
     # NBA season spans two years: Oct-June (e.g., 2024-25 season starts Oct 2024)
     # If month >= 10 (Oct-Dec), season is current year
     # If month < 10 (Jan-Sep), season is previous year
-    df_copy['season'] = df_copy['game_date'].apply(
-        lambda d: d.year if d.month >= 10 else d.year - 1
-    )
+    # Vectorized over the whole column (game_date holds datetime.date objects)
+    game_dates = pd.to_datetime(df_copy['game_date'])
+    df_copy['season'] = game_dates.dt.year - (game_dates.dt.month < 10).astype(int)
 
     # Unix timestamps are stored as-is (no conversion needed)
 
@@ -313,7 +314,7 @@ def prepare_mlb_df_for_db(df: pd.DataFrame) -> pd.DataFrame:
     df_copy['sport'] = 'MLB'
 
     # Add season column (extract year from game_date)
-    df_copy['season'] = df_copy['game_date'].apply(lambda d: d.year)
+    df_copy['season'] = pd.to_datetime(df_copy['game_date']).dt.year
 
     # Convert game_id to string (MLB API returns int)
     df_copy['game_id'] = df_copy['game_id'].astype(str)
@@ -461,6 +462,8 @@ class ActiveMarket(Base):
     # Market identification
     market_id = Column(String, nullable=False, unique=True)  # Polymarket market ID
     polymarket_slug = Column(String, nullable=False)  # URL slug format: "nfl-giants-broncos-2024-11-08"
+    clob_token_id = Column(String, nullable=True)  # CLOB token of the first outcome (for prices-history)
+    neg_risk = Column(Boolean, nullable=True)
 
     # Game information
     sport = Column(String, nullable=False)  # 'NBA' or 'NFL'
@@ -483,6 +486,23 @@ class ActiveMarket(Base):
     created_at = Column(DateTime, nullable=False)  # When we first discovered this market
 
 
+class MarketPriceHistory(Base):
+    """
+    Time series of price snapshots for active markets, written by the price tracker.
+    """
+    __tablename__ = "market_price_history"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    market_id = Column(String, nullable=False, index=True)  # References ActiveMarket.market_id
+    timestamp = Column(DateTime, nullable=False, index=True)  # When the price was observed (UTC)
+
+    away_price = Column(Float, nullable=False)  # Away team win probability
+    home_price = Column(Float, nullable=False)  # Home team win probability
+    mid_price = Column(Float, nullable=True)  # Average of both prices
+    volume = Column(Float, nullable=True)
+
+
 def insert_active_markets(markets: list[dict]) -> int:
     """
     Insert newly discovered active markets into the database.
@@ -500,6 +520,8 @@ def insert_active_markets(markets: list[dict]) -> int:
             - game_start_ts (int): Unix timestamp
             - market_open_ts (int, optional): Unix timestamp
             - market_close_ts (int, optional): Unix timestamp
+            - clob_token_id (str, optional)
+            - neg_risk (bool, optional)
             - market_status (str): default 'open'
 
     Returns:
@@ -541,6 +563,8 @@ def insert_active_markets(markets: list[dict]) -> int:
                     game_start_ts=to_unix_timestamp(market_data['game_start_ts']),
                     market_open_ts=to_unix_timestamp(market_data.get('market_open_ts')),
                     market_close_ts=to_unix_timestamp(market_data.get('market_close_ts')),
+                    clob_token_id=market_data.get('clob_token_id'),
+                    neg_risk=market_data.get('neg_risk'),
                     market_status=market_data.get('market_status', 'open'),
                     last_updated=now_timestamp,
                     created_at=now_datetime
@@ -583,6 +607,8 @@ def get_active_markets(status: str = 'open') -> list[dict]:
                 'id': m.id,
                 'market_id': m.market_id,
                 'polymarket_slug': m.polymarket_slug,
+                'clob_token_id': m.clob_token_id,
+                'neg_risk': m.neg_risk,
                 'sport': m.sport,
                 'game_date': m.game_date,
                 'away_team': m.away_team,
@@ -600,3 +626,47 @@ def get_active_markets(status: str = 'open') -> list[dict]:
         ]
     finally:
         session.close()
+
+
+def insert_price_snapshots(snapshots: list[dict]) -> int:
+    """
+    Bulk insert one cycle's price snapshots and bump last_updated on their markets.
+
+    Args:
+        snapshots: List of dicts with keys:
+            - market_id (str)
+            - timestamp (datetime): UTC observation time
+            - away_price (float)
+            - home_price (float)
+
+    Returns:
+        Number of snapshots inserted
+    """
+    if not snapshots:
+        return 0
+
+    rows = [
+        {
+            'market_id': snap['market_id'],
+            'timestamp': snap['timestamp'],
+            'away_price': snap['away_price'],
+            'home_price': snap['home_price'],
+            'mid_price': (snap['away_price'] + snap['home_price']) / 2
+        }
+        for snap in snapshots
+    ]
+    last_updated = int(max(snap['timestamp'] for snap in snapshots).timestamp())
+
+    session = SessionLocal()
+    try:
+        session.bulk_insert_mappings(MarketPriceHistory, rows)
+        session.query(ActiveMarket).filter(
+            ActiveMarket.market_id.in_({snap['market_id'] for snap in snapshots})
+        ).update({'last_updated': last_updated}, synchronize_session=False)
+        session.commit()
+        return len(rows)
+    except Exception as e:
+        session.rollback()
+        raise e
+    finally:
+        session.close()
@@ -7,17 +7,27 @@ Provides endpoints for:
 - Getting price history for similar games
 """
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-import aiohttp
 import asyncio
 from .db import SessionLocal, ActiveMarket, NFLGameFeatures, NBAGameFeatures
 from .services.knn_service import find_similar_games
 from .services.price_history_service import fetch_price_histories_batch
 from .team_mappings import get_polymarket_abbrev
 from backend.services import polymarket_api
+from backend.services.http_client import create_session
 
-app = FastAPI(title="Sports Betting Markets API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """One keep-alive HTTP session for all Polymarket calls made by request handlers."""
+    async with create_session() as session:
+        app.state.http_session = session
+        yield
+
+
+app = FastAPI(title="Sports Betting Markets API", lifespan=lifespan)
 
 # CORS middleware for local development
 app.add_middleware(
@@ -203,47 +213,47 @@ async def get_live_market(sport: str, game_id: str):
             }
 
         # Check if market exists on Polymarket
-        async with aiohttp.ClientSession() as session:
-            market_info = await polymarket_api.check_market_exists(
-                session=session,
-                sport=sport_upper,
-                date=game_date_val,
-                away_team=away_abbrev,
-                home_team=home_abbrev
-            )
-
-            if not market_info or not market_info.get('exists'):
-                return {
-                    "exists": False,
-                    "market_id": None,
-                    "polymarket_slug": None,
-                    "away_team": away_team_str,
-                    "home_team": home_team_str,
-                    "away_price": None,
-                    "home_price": None,
-                    "timestamp": None
-                }
-
-            # Market exists - fetch current price
-            current_price = await polymarket_api.get_current_price(
-                session=session,
-                sport=sport_upper,
-                date=game_date_val,
-                away_team=away_abbrev,
-                home_team=home_abbrev
-            )
+        session = app.state.http_session
+        market_info = await polymarket_api.check_market_exists(
+            session=session,
+            sport=sport_upper,
+            date=game_date_val,
+            away_team=away_abbrev,
+            home_team=home_abbrev
+        )
 
+        if not market_info or not market_info.get('exists'):
             return {
-                "exists": True,
-                "market_id": current_price.get('market_id'),
-                "polymarket_slug": market_info.get('slug'),
+                "exists": False,
+                "market_id": None,
+                "polymarket_slug": None,
                 "away_team": away_team_str,
                 "home_team": home_team_str,
-                "away_price": current_price.get('away_price'),
-                "home_price": current_price.get('home_price'),
-                "timestamp": current_price.get('timestamp')
+                "away_price": None,
+                "home_price": None,
+                "timestamp": None
             }
 
+        # Market exists - fetch current price
+        current_price = await polymarket_api.get_current_price(
+            session=session,
+            sport=sport_upper,
+            date=game_date_val,
+            away_team=away_abbrev,
+            home_team=home_abbrev
+        )
+
+        return {
+            "exists": True,
+            "market_id": current_price.get('market_id'),
+            "polymarket_slug": market_info.get('slug'),
+            "away_team": away_team_str,
+            "home_team": home_team_str,
+            "away_price": current_price.get('away_price'),
+            "home_price": current_price.get('home_price'),
+            "timestamp": current_price.get('timestamp')
+        }
+
     finally:
         db.close()
 
@@ -407,7 +417,8 @@ async def get_game_analysis(sport: str, game_id: str, k: int = 5):
         # Batch fetch price histories
         price_histories = await fetch_price_histories_batch(
             games=games_for_fetch,
-            include_game_interval=False  # Only need full history for now
+            include_game_interval=False,  # Only need full history for now
+            session=app.state.http_session
         )
 
         # Combine similar games with their price histories
@@ -1,6 +1,5 @@
 """Simple KNN for finding similar games."""
 from sqlalchemy.orm import Session
-from sklearn.neighbors import NearestNeighbors
 from sklearn.preprocessing import StandardScaler
 import numpy as np
 from ..db import NBAGameFeatures, NFLGameFeatures
@@ -27,10 +26,14 @@ MODELS = {
     'NFL': NFLGameFeatures
 }
 
-# Cache for fitted models: sport -> (scaler, knn, games, features)
+# Cache for fitted models: sport -> (scaler, X_scaled, games, features, X, index_by_id)
+# X holds the raw (untransformed) feature rows and index_by_id maps game_id -> row in X/games
 _cache = {}
 _cache_symmetric = {}
 
+# Rows per block in the _kneighbors scan (8192 x 16 float32 features = 512 KB)
+_SCAN_BLOCK_ROWS = 8192
+
 
 def _transform_symmetric_features(vals):
     """Transform [home_X, away_X, ...] to [max_X, min_X, ...]."""
@@ -57,10 +60,11 @@ def _fit_model(db: Session, sport: str, use_symmetric: bool = False):
         return None
 
     # Extract features
-    X = np.array([[getattr(g, f) if getattr(g, f) is not None else 0
-                   for f in features] for g in all_games])
+    X_raw = np.array([[getattr(g, f) if getattr(g, f) is not None else 0
+                       for f in features] for g in all_games])
 
     # Transform to symmetric if requested
+    X = X_raw
     if use_symmetric:
         X = np.array([_transform_symmetric_features(row) for row in X])
 
@@ -68,12 +72,59 @@ def _fit_model(db: Session, sport: str, use_symmetric: bool = False):
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(X)
 
-    # Fit KNN
-    knn_model = NearestNeighbors(n_neighbors=20, algorithm='ball_tree')
-    knn_model.fit(X_scaled)
+    # Searched by brute force in _kneighbors; contiguous float32 rows keep the scan
+    # vectorized at half the memory traffic (plenty of precision for scaled game stats)
+    X_scaled = np.ascontiguousarray(X_scaled, dtype=np.float32)
 
     print(f"Cached {len(all_games)} {sport} games")
-    return (scaler, knn_model, all_games, features)
+    index_by_id = {g.game_id: i for i, g in enumerate(all_games)}
+    return (scaler, X_scaled, all_games, features, X_raw, index_by_id)
+
+
+def _sq_distances(X_scaled, query_scaled):
+    """
+    Squared Euclidean distance from one scaled query row to every row of X_scaled.
+
+    With a few thousand low-dimensional rows, one NumPy scan beats a tree query and its
+    per-call overhead. The vector can be reused by _kneighbors for any number of neighbours.
+    """
+    # Scanned in row blocks so the (rows, features) temporaries stay cache-sized however
+    # many games are loaded; each row's distance is computed exactly as in one pass
+    query = np.asarray(query_scaled[0], dtype=np.float32)
+    sq_dists = np.empty(len(X_scaled), dtype=np.float32)
+    for start in range(0, len(X_scaled), _SCAN_BLOCK_ROWS):
+        block = X_scaled[start:start + _SCAN_BLOCK_ROWS]
+        np.sum((block - query) ** 2, axis=1, out=sq_dists[start:start + len(block)])
+    return sq_dists
+
+
+def _kneighbors(sq_dists, n_neighbors: int):
+    """
+    Exact nearest neighbours from a _sq_distances vector, nearest first.
+
+    Returns (distances, indices) shaped (1, n) like NearestNeighbors.kneighbors.
+    """
+    n = min(n_neighbors, len(sq_dists))
+    nearest = np.argpartition(sq_dists, n - 1)[:n]
+    nearest = nearest[np.argsort(sq_dists[nearest], kind='stable')]
+    # Distances go back as float64 so similarity scores stay plain floats for JSON
+    return np.sqrt(sq_dists[nearest].astype(np.float64))[None, :], nearest[None, :]
+
+
+def _get_fitted(db: Session, sport: str, use_symmetric: bool):
+    """Fitted model components for sport, fitting and caching them on first use."""
+    cache = _cache_symmetric if use_symmetric else _cache
+    if sport not in cache:
+        fitted = _fit_model(db, sport, use_symmetric=use_symmetric)
+        if not fitted:
+            return None
+        cache[sport] = fitted
+    return cache[sport]
+
+
+def warm_cache(db: Session, sport: str, use_symmetric: bool = True) -> bool:
+    """Fit and cache the sport's model up front. Returns False if there are no games."""
+    return _get_fitted(db, sport, use_symmetric) is not None
 
 
 def _flip_features(feature_vals, features):
@@ -162,17 +213,33 @@ def find_similar_games(db: Session, sport: str, game_id: str, k: int = 5, use_sy
         List of dicts with game info and similarity scores
     """
 
-    # Choose cache based on mode
-    cache = _cache_symmetric if use_symmetric else _cache
-
     # Use cache if available
-    if sport not in cache:
-        fitted = _fit_model(db, sport, use_symmetric=use_symmetric)
-        if not fitted:
-            return []
-        cache[sport] = fitted
+    fitted = _get_fitted(db, sport, use_symmetric)
+    if not fitted:
+        return []
+
+    target_vals = _target_values(db, sport, game_id, fitted, away_stats_game, home_stats_game)
+    if target_vals is None:
+        return []
+
+    scaler, X_scaled, _, features, _, _ = fitted
+
+    # Query cached model (fast!)
+    sq_dists = _sq_distances(X_scaled, _scale_target(scaler, target_vals, use_symmetric))
+
+    # Flip-and-search only applies to raw features (symmetry is built into symmetric mode)
+    sq_dists_flip = None
+    if use_symmetry and not use_symmetric:
+        sq_dists_flip = _sq_distances(X_scaled, scaler.transform([_flip_features(target_vals, features)]))
 
-    scaler, knn_model, all_games, features = cache[sport]
+    # The query game itself is skipped (not applicable for synthetic upcoming games)
+    exclude_game_id = None if away_stats_game and home_stats_game else game_id
+    return _similar_games(fitted, target_vals, k, exclude_game_id, use_symmetric, sq_dists, sq_dists_flip)
+
+
+def _target_values(db: Session, sport: str, game_id: str, fitted, away_stats_game=None, home_stats_game=None):
+    """Raw feature values of the target game, or None if it isn't in the database."""
+    _, _, _, features, X_raw, index_by_id = fitted
 
     # Get target game - either from database or construct from provided stats
     if away_stats_game and home_stats_game:
@@ -191,28 +258,44 @@ def find_similar_games(db: Session, sport: str, game_id: str, k: int = 5, use_sy
                 target_vals.append(val if val is not None else 0)
             else:
                 target_vals.append(0)
-    else:
-        # Normal path - get target game from database
-        model = MODELS[sport]
-        target = db.query(model).filter_by(game_id=game_id).first()
-        if not target:
-            return []
+        return target_vals
 
-        # Extract target features
-        target_vals = [getattr(target, f) for f in features]
+    if game_id in index_by_id:
+        # Normal path - target game is already in the cached feature matrix
+        return X_raw[index_by_id[game_id]].tolist()
 
-    # Store original target features for mapping determination
-    target_vals_original = target_vals.copy()
+    # Target game wasn't fitted (e.g. missing features) - get it from database
+    model = MODELS[sport]
+    target = db.query(model).filter_by(game_id=game_id).first()
+    if not target:
+        return None
+
+    # Extract target features
+    return [getattr(target, f) for f in features]
 
+
+def _scale_target(scaler, target_vals, use_symmetric: bool):
+    """Scaled query row for the target's raw feature values."""
     # Transform if using symmetric mode
     if use_symmetric:
         target_vals = _transform_symmetric_features(target_vals)
+    return scaler.transform([target_vals])
 
-    target_scaled = scaler.transform([target_vals])
 
-    # Query cached model (fast!)
+def _similar_games(fitted, target_vals_original, k: int, exclude_game_id, use_symmetric: bool,
+                   sq_dists, sq_dists_flip=None):
+    """
+    Build find_similar_games results from precomputed _sq_distances vectors.
+
+    target_vals_original are the target's raw (untransformed) features, used for the
+    mapping. sq_dists comes from the target's own query; sq_dists_flip, from its
+    home/away-flipped query, is given only for a flip-and-search (use_symmetry without
+    use_symmetric). exclude_game_id is skipped in the results (None for synthetic games).
+    """
+    _, _, all_games, features, _, _ = fitted
+
     # Request k+1 to account for query game potentially being in results
-    distances, indices = knn_model.kneighbors(target_scaled, n_neighbors=k+1)
+    distances, indices = _kneighbors(sq_dists, k+1)
 
     # If using symmetric features, no need for flip-and-search (symmetry is built-in)
     if use_symmetric:
@@ -221,7 +304,7 @@ def find_similar_games(db: Session, sport: str, game_id: str, k: int = 5, use_sy
         for i, idx in enumerate(indices[0]):
             game = all_games[idx]
             # Skip the query game itself (not applicable for synthetic upcoming games)
-            if not (away_stats_game and home_stats_game) and game.game_id == game_id:
+            if game.game_id == exclude_game_id:
                 continue
             valid_games.append((game, distances[0][i]))
             # Stop once we have k results
@@ -266,23 +349,20 @@ def find_similar_games(db: Session, sport: str, game_id: str, k: int = 5, use_sy
     for i, idx in enumerate(indices[0]):
         game = all_games[idx]
         # Skip the query game itself (not applicable for synthetic upcoming games)
-        if not (away_stats_game and home_stats_game) and game.game_id == game_id:
+        if game.game_id == exclude_game_id:
             continue
         if game.game_id not in valid_games_dict:
             valid_games_dict[game.game_id] = (game, distances[0][i])
 
     # If symmetry enabled, also search with flipped features
-    if use_symmetry:
-        flipped_vals = _flip_features(target_vals, features)
-        flipped_scaled = scaler.transform([flipped_vals])
-
-        distances_flip, indices_flip = knn_model.kneighbors(flipped_scaled, n_neighbors=k+1)
+    if sq_dists_flip is not None:
+        distances_flip, indices_flip = _kneighbors(sq_dists_flip, k+1)
 
         # Collect valid games from flipped search
         for i, idx in enumerate(indices_flip[0]):
             game = all_games[idx]
             # Skip the query game itself (not applicable for synthetic upcoming games)
-            if not (away_stats_game and home_stats_game) and game.game_id == game_id:
+            if game.game_id == exclude_game_id:
                 continue
             # Keep the game with smaller distance (better match)
             if game.game_id not in valid_games_dict:
@@ -325,6 +405,70 @@ def find_similar_games(db: Session, sport: str, game_id: str, k: int = 5, use_sy
     return results
 
 
+def find_similar_games_batch(db: Session, sport: str, game_id: str, configs: list[dict]) -> dict[tuple, list]:
+    """
+    Run find_similar_games for several option combinations on one target game.
+
+    The target is looked up, and its distances to every game computed, once per feature
+    space (use_symmetric) and query (plain or home/away-flipped); each config then only
+    picks its k nearest from those vectors. Results match separate find_similar_games calls.
+
+    Args:
+        db: Database session
+        sport: 'NBA' or 'NFL'
+        game_id: Target game ID to find similar games for
+        configs: Dicts of find_similar_games options k, use_symmetry and use_symmetric,
+                 e.g. [{'use_symmetry': False}, {'use_symmetry': True}]
+
+    Returns:
+        Dict mapping tuple(sorted(config.items())) to that config's results. Configs that
+        amount to the same search (use_symmetry is ignored in symmetric mode) share one
+        results list.
+    """
+    results = {}
+    searches = {}
+    spaces = {}  # use_symmetric -> [fitted, target_vals, sq_dists, sq_dists_flip] or None
+    for config in configs:
+        options = {'k': 5, 'use_symmetry': False, 'use_symmetric': True, **config}
+        k, use_symmetry, use_symmetric = options['k'], options['use_symmetry'], options['use_symmetric']
+        if use_symmetric:
+            use_symmetry = False
+        search_key = (k, use_symmetry, use_symmetric)
+
+        if search_key not in searches:
+            if use_symmetric not in spaces:
+                spaces[use_symmetric] = _batch_space(db, sport, game_id, use_symmetric)
+            space = spaces[use_symmetric]
+
+            if space is None:
+                searches[search_key] = []
+            else:
+                fitted, target_vals, sq_dists, sq_dists_flip = space
+                if use_symmetry and sq_dists_flip is None:
+                    scaler, X_scaled, _, features, _, _ = fitted
+                    sq_dists_flip = _sq_distances(X_scaled, scaler.transform([_flip_features(target_vals, features)]))
+                    space[3] = sq_dists_flip
+                searches[search_key] = _similar_games(fitted, target_vals, k, game_id, use_symmetric,
+                                                      sq_dists, sq_dists_flip if use_symmetry else None)
+
+        results[tuple(sorted(config.items()))] = searches[search_key]
+    return results
+
+
+def _batch_space(db: Session, sport: str, game_id: str, use_symmetric: bool):
+    """[fitted, target_vals, sq_dists, None] for one feature space, or None if there's nothing to search."""
+    fitted = _get_fitted(db, sport, use_symmetric)
+    if not fitted:
+        return None
+
+    target_vals = _target_values(db, sport, game_id, fitted)
+    if target_vals is None:
+        return None
+
+    scaler, X_scaled, _, _, _, _ = fitted
+    return [fitted, target_vals, _sq_distances(X_scaled, _scale_target(scaler, target_vals, use_symmetric)), None]
+
+
 def clear_cache():
     """Clear cache when new data added."""
     global _cache, _cache_symmetric
@@ -3,15 +3,18 @@ Service for batch fetching price histories from Polymarket.
 """
 import asyncio
 import aiohttp
-from typing import List, Dict, Any
+import contextlib
+from typing import List, Dict, Any, Optional
 from datetime import date
 
 from backend.services import polymarket_api
+from backend.services.http_client import create_session
 
 
 async def fetch_price_histories_batch(
     games: List[Dict[str, Any]],
-    include_game_interval: bool = False
+    include_game_interval: bool = False,
+    session: Optional[aiohttp.ClientSession] = None
 ) -> Dict[str, Dict[str, Any]]:
     """
     Batch fetch price histories for multiple games from Polymarket.
@@ -24,6 +27,7 @@ async def fetch_price_histories_batch(
             - away_team (str): Away team name (Polymarket format)
             - home_team (str): Home team name (Polymarket format)
         include_game_interval: If True, includes game_history in addition to full_history
+        session: Existing session to reuse (left open); a new one is created if omitted
 
     Returns:
         Dict mapping game_id to price history data:
@@ -41,7 +45,8 @@ async def fetch_price_histories_batch(
 
         Games without Polymarket data will have empty dict as value.
     """
-    async with aiohttp.ClientSession() as session:
+    session_context = contextlib.nullcontext(session) if session is not None else create_session()
+    async with session_context as session:
         # Create tasks for fetching all price histories concurrently
         tasks = []
         for game in games:
@@ -5,20 +5,10 @@ Provides functions to convert full team names (e.g., "Houston Rockets")
 to Polymarket 3-letter abbreviations (e.g., "hou") for API calls.
 """
 
-from backend.services.basketball_api import TEAM_ID_MAP as NBA_TEAM_ID_MAP
-from backend.services.football_api import TEAM_ID_MAP as NFL_TEAM_ID_MAP
-
-
-# Build reverse lookup dictionaries: Full Name -> Polymarket Abbreviation
-NBA_NAME_TO_POLYMARKET = {
-    full_name: poly_abbrev
-    for _, (full_name, _, poly_abbrev) in NBA_TEAM_ID_MAP.items()
-}
-
-NFL_NAME_TO_POLYMARKET = {
-    full_name: poly_abbrev
-    for _, (full_name, _, poly_abbrev) in NFL_TEAM_ID_MAP.items()
-}
+# Full Name -> Polymarket Abbreviation lookups are precomputed by
+# backend/scripts/generate_team_mappings.py so importing this module doesn't
+# pull in the service modules or rebuild the dicts.
+from .team_mappings_data import NBA_NAME_TO_POLYMARKET, NFL_NAME_TO_POLYMARKET
 
 
 def get_polymarket_abbrev(team_name: str, sport: str) -> str:
@@ -0,0 +1,74 @@
+"""
+Generated by backend/scripts/generate_team_mappings.py - do not edit by hand.
+
+Full team name -> Polymarket abbreviation lookups built from the service
+modules' TEAM_ID_MAP tables.
+"""
+
+NBA_NAME_TO_POLYMARKET = {
+    "Atlanta Hawks": "atl",
+    "Boston Celtics": "bos",
+    "New Orleans Pelicans": "nop",
+    "Chicago Bulls": "chi",
+    "Cleveland Cavaliers": "cle",
+    "Dallas Mavericks": "dal",
+    "Denver Nuggets": "den",
+    "Detroit Pistons": "det",
+    "Golden State Warriors": "gsw",
+    "Houston Rockets": "hou",
+    "Indiana Pacers": "ind",
+    "LA Clippers": "lac",
+    "Los Angeles Lakers": "lal",
+    "Miami Heat": "mia",
+    "Milwaukee Bucks": "mil",
+    "Minnesota Timberwolves": "min",
+    "Brooklyn Nets": "bkn",
+    "New York Knicks": "nyk",
+    "Orlando Magic": "orl",
+    "Philadelphia 76ers": "phi",
+    "Phoenix Suns": "phx",
+    "Portland Trail Blazers": "por",
+    "Sacramento Kings": "sac",
+    "San Antonio Spurs": "sas",
+    "Oklahoma City Thunder": "okc",
+    "Utah Jazz": "uta",
+    "Washington Wizards": "was",
+    "Toronto Raptors": "tor",
+    "Memphis Grizzlies": "mem",
+    "Charlotte Hornets": "cha",
+}
+
+NFL_NAME_TO_POLYMARKET = {
+    "Atlanta Falcons": "atl",
+    "Buffalo Bills": "buf",
+    "Chicago Bears": "chi",
+    "Cincinnati Bengals": "cin",
+    "Cleveland Browns": "cle",
+    "Dallas Cowboys": "dal",
+    "Denver Broncos": "den",
+    "Detroit Lions": "det",
+    "Green Bay Packers": "gb",
+    "Tennessee Titans": "ten",
+    "Indianapolis Colts": "ind",
+    "Kansas City Chiefs": "kc",
+    "Las Vegas Raiders": "lv",
+    "Los Angeles Rams": "la",
+    "Miami Dolphins": "mia",
+    "Minnesota Vikings": "min",
+    "New England Patriots": "ne",
+    "New Orleans Saints": "no",
+    "New York Giants": "nyg",
+    "New York Jets": "nyj",
+    "Philadelphia Eagles": "phi",
+    "Arizona Cardinals": "ari",
+    "Pittsburgh Steelers": "pit",
+    "Los Angeles Chargers": "lac",
+    "San Francisco 49ers": "sf",
+    "Seattle Seahawks": "sea",
+    "Tampa Bay Buccaneers": "tb",
+    "Washington Commanders": "was",
+    "Carolina Panthers": "car",
+    "Jacksonville Jaguars": "jax",
+    "Baltimore Ravens": "bal",
+    "Houston Texans": "hou",
+}
@@ -15,10 +15,10 @@ from pathlib import Path
 # Add backend to path for imports
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
-import asyncio
 from datetime import datetime
 from sqlalchemy import text
 from backend.services import football_api, basketball_api
+from backend.services.http_client import run
 from backend.app.db import insert_nfl_games, insert_nba_games, engine
 
 
@@ -213,4 +213,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -17,16 +17,59 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 import asyncio
 import aiohttp
+import logging
+import logging.handlers
+import queue
 from datetime import datetime, timedelta, date
 from zoneinfo import ZoneInfo
-from sqlalchemy import text
+from sqlalchemy import text, update
 
 # Import service APIs
 from backend.services import polymarket_api
+from backend.services.http_client import create_session, get_json_cached, run
 from backend.services.football_api import TEAM_ID_MAP as NFL_TEAM_MAP
 from backend.services.basketball_api import TEAM_ID_MAP as NBA_TEAM_MAP
 from backend.app import db
 
+logger = logging.getLogger("discover")
+
+# ESPN team id -> Polymarket abbreviation, derived once from the TEAM_ID_MAPs
+NFL_POLY_BY_ID: dict[int, str] = {team_id: info[2] for team_id, info in NFL_TEAM_MAP.items() if info[2]}
+NBA_POLY_BY_ID: dict[int, str] = {team_id: info[2] for team_id, info in NBA_TEAM_MAP.items() if info[2]}
+
+# Game dates are bucketed by US Eastern time
+ET = ZoneInfo("America/New_York")
+
+# On-disk cache TTLs for ESPN schedule responses (seconds)
+NFL_SCHEDULE_TTL = 3600
+NBA_SCOREBOARD_TTL = 600
+
+# Caps concurrent check_market_exists calls during discovery
+_market_check_semaphore = asyncio.Semaphore(16)
+
+
+# ============================================================================
+# LOGGING
+# ============================================================================
+
+def setup_logging() -> logging.handlers.QueueListener:
+    """
+    Route log records through a queue so the event loop never blocks on stdout.
+
+    Returns the started QueueListener; call .stop() on exit to flush it.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    return listener
+
 
 # ============================================================================
 # DATABASE CONNECTION TEST
@@ -34,9 +77,9 @@ from backend.app import db
 
 def test_database_connection():
     """Test database connection before starting discovery."""
-    print("\n" + "=" * 60)
-    print("DATABASE CONNECTION TEST")
-    print("=" * 60)
+    logger.info("\n" + "=" * 60)
+    logger.info("DATABASE CONNECTION TEST")
+    logger.info("=" * 60)
 
     try:
         # Test connection with a simple query
@@ -55,19 +98,19 @@ def test_database_connection():
         else:
             display_url = db_url
 
-        print(f"✓ Successfully connected to database")
-        print(f"  URL: {display_url}")
-        print("=" * 60 + "\n")
+        logger.info("✓ Successfully connected to database")
+        logger.info("  URL: %s", display_url)
+        logger.info("=" * 60 + "\n")
         return True
 
     except Exception as e:
-        print(f"✗ Failed to connect to database")
-        print(f"  Error: {e}")
-        print("\nPlease check:")
-        print("  1. PostgreSQL is running")
-        print("  2. DATABASE_URL in .env is correct")
-        print("  3. Database exists and user has access")
-        print("=" * 60 + "\n")
+        logger.error("✗ Failed to connect to database")
+        logger.error("  Error: %s", e)
+        logger.info("\nPlease check:")
+        logger.info("  1. PostgreSQL is running")
+        logger.info("  2. DATABASE_URL in .env is correct")
+        logger.info("  3. Database exists and user has access")
+        logger.info("=" * 60 + "\n")
         return False
 
 
@@ -75,6 +118,124 @@ def test_database_connection():
 # MARKET DISCOVERY
 # ============================================================================
 
+def _parse_game(game: dict, sport: str, poly_by_id: dict[int, str]) -> tuple | None:
+    """
+    Turn one ESPN event into a candidate for check_market_exists.
+
+    Args:
+        game: ESPN event/game dict (schedule and scoreboard share this shape)
+        sport: 'NFL' or 'NBA'
+        poly_by_id: ESPN team id -> Polymarket abbreviation for the sport
+
+    Returns:
+        (game_meta, sport, game_date, away_poly, home_poly) tuple, or None if
+        the game is incomplete or has no Polymarket team mapping
+    """
+    competitions = game.get("competitions", [])
+    if not competitions:
+        return None
+
+    competitors = competitions[0].get("competitors", [])
+
+    # Extract home and away teams
+    home_team = next((c for c in competitors if c.get("homeAway") == "home"), None)
+    away_team = next((c for c in competitors if c.get("homeAway") == "away"), None)
+
+    if not home_team or not away_team:
+        return None
+
+    # Parse game date
+    game_date_str = game.get("date")
+    if not game_date_str:
+        return None
+
+    game_datetime_utc = datetime.fromisoformat(game_date_str)  # 3.11+ parses the "Z" suffix natively
+    game_date = game_datetime_utc.astimezone(ET).date()
+
+    # Get team IDs and names
+    away_id = int(away_team["id"])
+    home_id = int(home_team["id"])
+    away_name = away_team.get("team", {}).get("displayName", "Unknown")
+    home_name = home_team.get("team", {}).get("displayName", "Unknown")
+
+    # Get Polymarket team abbreviations
+    away_poly = poly_by_id.get(away_id)
+    home_poly = poly_by_id.get(home_id)
+
+    if not away_poly or not home_poly:
+        logger.info("  Skipping: No Polymarket mapping for %s @ %s", away_name, home_name)
+        return None
+
+    return ({
+        "sport": sport,
+        "game_date": game_date,
+        "away_team": away_name,
+        "away_team_id": str(away_id),
+        "home_team": home_name,
+        "home_team_id": str(home_id),
+    }, sport.lower(), game_date, away_poly, home_poly)
+
+
+async def _fetch_week(session: aiohttp.ClientSession, year: int, week: int) -> dict | None:
+    """Fetch one week of the ESPN NFL schedule. Returns parsed JSON or None."""
+    url = f"https://cdn.espn.com/core/nfl/schedule?xhr=1&year={year}&week={week}"
+    return await get_json_cached(session, url, NFL_SCHEDULE_TTL)
+
+
+async def _check_candidate(session: aiohttp.ClientSession, candidate: tuple) -> tuple:
+    """Run check_market_exists for one candidate game under the discovery semaphore."""
+    game_meta, sport, game_date, away_poly, home_poly = candidate
+    async with _market_check_semaphore:
+        market_info = await polymarket_api.check_market_exists(
+            session,
+            sport=sport,
+            date=game_date,
+            away_team=away_poly,
+            home_team=home_poly
+        )
+    return candidate, market_info
+
+
+async def _check_candidates(session: aiohttp.ClientSession, candidates: list[tuple]) -> list[dict]:
+    """
+    Check all candidate games for Polymarket markets concurrently.
+
+    Args:
+        session: aiohttp session
+        candidates: (game_meta, sport, game_date, away_poly, home_poly) tuples
+
+    Returns:
+        List of market dicts ready for insertion
+    """
+    results = await asyncio.gather(
+        *[_check_candidate(session, c) for c in candidates],
+        return_exceptions=True
+    )
+
+    markets = []
+    for result in results:
+        if isinstance(result, Exception):
+            logger.error("  Error checking market: %s", result)
+            continue
+
+        (game_meta, _, game_date, away_poly, home_poly), market_info = result
+        if market_info.get("exists"):
+            markets.append({
+                "market_id": market_info["market_id"],
+                "polymarket_slug": market_info["polymarket_slug"],
+                **game_meta,
+                "game_start_ts": market_info["game_start_ts"],
+                "market_open_ts": market_info.get("market_open_ts"),
+                "market_close_ts": market_info.get("market_close_ts"),
+                "clob_token_id": market_info.get("clob_token_id"),
+                "neg_risk": market_info.get("neg_risk"),
+                "market_status": "open"
+            })
+            logger.info("  Found: %s @ %s on %s", away_poly, home_poly, game_date)
+
+    return markets
+
+
 async def discover_nfl_markets(session: aiohttp.ClientSession, days_ahead: int = 10) -> list[dict]:
     """
     Discover upcoming NFL games and check for Polymarket markets.
@@ -86,106 +247,73 @@ async def discover_nfl_markets(session: aiohttp.ClientSession, days_ahead: int =
     Returns:
         List of market dicts ready for insertion
     """
-    print("Discovering NFL markets...")
-    markets = []
+    logger.info("Discovering NFL markets...")
+    candidates = []
 
     # Query ESPN API for upcoming NFL games
     # Get current week and year
-    today = datetime.now(ZoneInfo("America/New_York"))
+    today = datetime.now(ET)
+    today_date = today.date()
     current_year = today.year
 
     # NFL season: Sept-Feb (weeks 1-18 + playoffs)
     # Simple heuristic: check current week through next 4 weeks
-    for week_offset in range(5):
-        # Estimate current week (rough approximation)
-        # Week 1 typically starts first week of September
-        week = min(18, 1 + (today.timetuple().tm_yday - 245) // 7 + week_offset)
+    # Estimate current week (rough approximation)
+    # Week 1 typically starts first week of September
+    # Late in the season several offsets clamp to week 18, so dedupe
+    current_week = 1 + (today.timetuple().tm_yday - 245) // 7
+    weeks = sorted({min(18, current_week + week_offset) for week_offset in range(5)})
+
+    # Fetch all weeks concurrently
+    results = await asyncio.gather(
+        *[_fetch_week(session, current_year, week) for week in weeks],
+        return_exceptions=True
+    )
+
+    # Phase 1: walk every fetched week and collect candidate games (no network)
+    for week, data in zip(weeks, results):
+        if isinstance(data, Exception):
+            logger.error("  Error fetching NFL week %s: %s", week, data)
+            continue
+        if not data:
+            continue
 
-        url = f"https://cdn.espn.com/core/nfl/schedule?xhr=1&year={current_year}&week={week}"
+        for week_data in data.get("content", {}).get("schedule", {}).values():
+            for game in week_data.get("games", []):
+                try:
+                    candidate = _parse_game(game, "NFL", NFL_POLY_BY_ID)
+                    if candidate is None:
+                        continue
 
-        try:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    continue
+                    # Skip past games or games too far in future
+                    days_until = (candidate[2] - today_date).days
+                    if days_until < 0 or days_until > days_ahead:
+                        continue
 
-                data = await response.json()
-                events = data.get("content", {}).get("schedule", {}).values()
-
-                for week_data in events:
-                    games = week_data.get("games", [])
-
-                    for game in games:
-                        try:
-                            # Extract game info
-                            event_id = game.get("id")
-                            competition = game.get("competitions", [{}])[0]
-                            competitors = competition.get("competitors", [])
-
-                            home_team = next((c for c in competitors if c.get("homeAway") == "home"), None)
-                            away_team = next((c for c in competitors if c.get("homeAway") == "away"), None)
-
-                            if not home_team or not away_team:
-                                continue
-
-                            # Parse game date
-                            game_date_str = game.get("date")
-                            game_datetime_utc = datetime.fromisoformat(game_date_str.replace("Z", "+00:00"))
-                            game_datetime_et = game_datetime_utc.astimezone(ZoneInfo("America/New_York"))
-                            game_date = game_datetime_et.date()
-
-                            # Skip past games or games too far in future
-                            days_until = (game_date - today.date()).days
-                            if days_until < 0 or days_until > days_ahead:
-                                continue
-
-                            away_id = int(away_team["id"])
-                            home_id = int(home_team["id"])
-
-                            # Get Polymarket team names from mapping
-                            away_poly = NFL_TEAM_MAP.get(away_id, (None, None, None))[2]
-                            home_poly = NFL_TEAM_MAP.get(home_id, (None, None, None))[2]
-
-                            if not away_poly or not home_poly:
-                                continue
-
-                            # Check if Polymarket market exists
-                            market_info = await polymarket_api.check_market_exists(
-                                session,
-                                sport="nfl",
-                                date=game_date,
-                                away_team=away_poly,
-                                home_team=home_poly
-                            )
-
-                            if market_info.get("exists"):
-                                markets.append({
-                                    "market_id": market_info["market_id"],
-                                    "polymarket_slug": market_info["polymarket_slug"],
-                                    "sport": "NFL",
-                                    "game_date": game_date,
-                                    "away_team": away_team.get("team", {}).get("displayName", "Unknown"),
-                                    "away_team_id": str(away_id),
-                                    "home_team": home_team.get("team", {}).get("displayName", "Unknown"),
-                                    "home_team_id": str(home_id),
-                                    "game_start_ts": market_info["game_start_ts"],
-                                    "market_open_ts": market_info.get("market_open_ts"),
-                                    "market_close_ts": market_info.get("market_close_ts"),
-                                    "market_status": "open"
-                                })
-                                print(f"  Found: {away_poly} @ {home_poly} on {game_date}")
-
-                        except Exception as e:
-                            print(f"  Error processing NFL game {event_id}: {e}")
-                            continue
+                    candidates.append(candidate)
 
-        except Exception as e:
-            print(f"  Error fetching NFL week {week}: {e}")
-            continue
+                except Exception as e:
+                    logger.error("  Error processing NFL game %s: %s", game.get("id"), e)
+                    continue
+
+    # Phase 2: check all candidate games against Polymarket concurrently
+    markets = await _check_candidates(session, candidates)
 
-    print(f"Found {len(markets)} NFL markets")
+    logger.info("Found %s NFL markets", len(markets))
     return markets
 
 
+async def _fetch_nba_scoreboard(session: aiohttp.ClientSession, start_date: date, end_date: date) -> dict | None:
+    """Fetch the ESPN NBA scoreboard for every date in [start_date, end_date] in one request."""
+    # ESPN NBA Scoreboard API accepts a YYYYMMDD-YYYYMMDD range; limit lifts the default page size
+    scoreboard_url = (
+        "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
+        f"?dates={start_date.strftime('%Y%m%d')}-{end_date.strftime('%Y%m%d')}&limit=1000"
+    )
+
+    return await get_json_cached(session, scoreboard_url, NBA_SCOREBOARD_TTL)
+
+
 async def discover_nba_markets(session: aiohttp.ClientSession, days_ahead: int = 10) -> list[dict]:
     """
     Discover upcoming NBA games and check for Polymarket markets.
@@ -197,119 +325,80 @@ async def discover_nba_markets(session: aiohttp.ClientSession, days_ahead: int =
     Returns:
         List of market dicts ready for database insertion
     """
-    print(f"Discovering NBA markets (next {days_ahead} days)...")
+    logger.info("Discovering NBA markets (next %s days)...", days_ahead)
 
-    markets = []
-    today = datetime.now(ZoneInfo("America/New_York")).date()
+    candidates = []
+    today = datetime.now(ET).date()
+    end_date = today + timedelta(days=days_ahead)
 
-    # Loop through upcoming dates
-    for day_offset in range(days_ahead + 1):
-        check_date = today + timedelta(days=day_offset)
-        date_str = check_date.strftime("%Y%m%d")
+    # One scoreboard request covers the whole window (off-days simply have no events)
+    try:
+        data = await _fetch_nba_scoreboard(session, today, end_date)
+    except Exception as e:
+        logger.error("  Error fetching NBA scoreboard for %s to %s: %s", today, end_date, e)
+        data = None
 
+    # Phase 1: walk the scoreboard and collect candidate games (no network)
+    for event in (data or {}).get("events", []):
         try:
-            # ESPN NBA Scoreboard API
-            scoreboard_url = f"https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard?dates={date_str}"
+            # Filter to regular season only
+            season_type = event.get("season", {}).get("type", 0)
+            if season_type != 2:  # 2 = regular season
+                continue
 
-            async with session.get(scoreboard_url) as response:
-                if response.status != 200:
-                    continue
+            candidate = _parse_game(event, "NBA", NBA_POLY_BY_ID)
+            if candidate is None:
+                continue
 
-                data = await response.json()
-                events = data.get("events", [])
-
-                for event in events:
-                    try:
-                        # Filter to regular season only
-                        season_type = event.get("season", {}).get("type", 0)
-                        if season_type != 2:  # 2 = regular season
-                            continue
-
-                        event_id = event.get("id")
-                        if not event_id:
-                            continue
-
-                        # Get competition data
-                        competitions = event.get("competitions", [])
-                        if not competitions:
-                            continue
-
-                        competition = competitions[0]
-                        competitors = competition.get("competitors", [])
-
-                        if len(competitors) < 2:
-                            continue
-
-                        # Extract home and away teams
-                        home_team = next((c for c in competitors if c.get("homeAway") == "home"), None)
-                        away_team = next((c for c in competitors if c.get("homeAway") == "away"), None)
-
-                        if not home_team or not away_team:
-                            continue
-
-                        # Get team IDs and names
-                        away_id = int(away_team["id"])
-                        home_id = int(home_team["id"])
-                        away_name = away_team.get("team", {}).get("displayName", "Unknown")
-                        home_name = home_team.get("team", {}).get("displayName", "Unknown")
-
-                        # Parse game date
-                        game_date_str = event.get("date")
-                        if not game_date_str:
-                            continue
-
-                        game_datetime_utc = datetime.fromisoformat(game_date_str.replace("Z", "+00:00"))
-                        game_datetime_et = game_datetime_utc.astimezone(ZoneInfo("America/New_York"))
-                        game_date = game_datetime_et.date()
-
-                        # Get Polymarket team abbreviations
-                        away_poly = NBA_TEAM_MAP.get(away_id, (None, None, None))[2]
-                        home_poly = NBA_TEAM_MAP.get(home_id, (None, None, None))[2]
-
-                        if not away_poly or not home_poly:
-                            print(f"  Skipping: No Polymarket mapping for {away_name} @ {home_name}")
-                            continue
-
-                        # Check if Polymarket market exists
-                        market_info = await polymarket_api.check_market_exists(
-                            session, sport="nba", date=game_date, away_team=away_poly, home_team=home_poly
-                        )
-
-                        if market_info.get("exists"):
-                            markets.append({
-                                "market_id": market_info["market_id"],
-                                "polymarket_slug": market_info["polymarket_slug"],
-                                "sport": "NBA",
-                                "game_date": game_date,
-                                "away_team": away_name,
-                                "away_team_id": str(away_id),
-                                "home_team": home_name,
-                                "home_team_id": str(home_id),
-                                "game_start_ts": market_info["game_start_ts"],
-                                "market_open_ts": market_info.get("market_open_ts"),
-                                "market_close_ts": market_info.get("market_close_ts"),
-                                "market_status": "open"
-                            })
-                            print(f"  Found: {away_poly} @ {home_poly} on {game_date}")
-
-                    except Exception as e:
-                        print(f"  Error processing NBA game {event_id}: {e}")
-                        continue
+            # The range is in ESPN's (UTC) dates; keep only ET dates inside the window
+            if not today <= candidate[2] <= end_date:
+                continue
+
+            candidates.append(candidate)
 
         except Exception as e:
-            print(f"  Error fetching NBA scoreboard for {check_date}: {e}")
+            logger.error("  Error processing NBA game %s: %s", event.get("id"), e)
             continue
 
-    print(f"Found {len(markets)} NBA markets")
+    # Phase 2: check all candidate games against Polymarket concurrently
+    markets = await _check_candidates(session, candidates)
+
+    logger.info("Found %s NBA markets", len(markets))
     return markets
 
 
+async def _warm_connections(session: aiohttp.ClientSession):
+    """Open keep-alive connections (DNS + TLS) to the upstream hosts used by discovery."""
+    hosts = [
+        "https://cdn.espn.com",
+        "https://site.api.espn.com",
+        "https://gamma-api.polymarket.com",
+    ]
+
+    async def _head(url):
+        try:
+            async with session.head(url):
+                pass
+        except Exception:
+            # Warm-up is best effort; real requests will report errors
+            pass
+
+    await asyncio.gather(*[_head(url) for url in hosts])
+
+
 async def cleanup_old_markets():
     """
     Remove markets that have been resolved or are past their game time.
     Update status of closed markets.
     """
-    print("Cleaning up old markets...")
+    logger.info("Cleaning up old markets...")
+
+    # Blocking DB work runs in a worker thread to keep the event loop free
+    await asyncio.to_thread(_close_started_markets)
+
+
+def _close_started_markets():
+    """Mark open markets whose game has started as closed."""
 
     from datetime import timezone
 
@@ -317,39 +406,45 @@ async def cleanup_old_markets():
     try:
         now_ts = int(datetime.now(timezone.utc).timestamp())
 
-        # Get all open markets
-        open_markets = session.query(db.ActiveMarket).filter_by(market_status='open').all()
+        # If game has started, mark as closed (single UPDATE, Postgres RETURNING for logging)
+        closed = session.execute(
+            update(db.ActiveMarket)
+            .where(db.ActiveMarket.market_status == 'open')
+            .where(db.ActiveMarket.game_start_ts < now_ts)
+            .values(market_status='closed')
+            .returning(db.ActiveMarket.polymarket_slug)
+        ).scalars().all()
 
-        for market in open_markets:
-            # If game has started, mark as closed
-            if market.game_start_ts and market.game_start_ts < now_ts:
-                # Game has started, mark as closed
-                market.market_status = 'closed'
-                print(f"  Marked as closed: {market.polymarket_slug}")
+        for slug in closed:
+            logger.info("  Marked as closed: %s", slug)
 
         session.commit()
-        print("Cleanup complete")
+        logger.info("Cleanup complete")
 
     except Exception as e:
         session.rollback()
-        print(f"Error during cleanup: {e}")
+        logger.error("Error during cleanup: %s", e)
     finally:
         session.close()
 
 
 async def main():
     """Main entry point for market discovery."""
-    print("=" * 60)
-    print("NFL & NBA Market Discovery Service")
-    print(f"Started at: {datetime.now()}")
-    print("=" * 60)
-
-    # Test database connection first
-    if not test_database_connection():
-        print("✗ Aborting: Cannot connect to database")
-        sys.exit(1)
+    logger.info("=" * 60)
+    logger.info("NFL & NBA Market Discovery Service")
+    logger.info("Started at: %s", datetime.now())
+    logger.info("=" * 60)
+
+    async with create_session() as session:
+        # Test database connection (in a thread) while opening connections to the upstream APIs
+        db_ok, _ = await asyncio.gather(
+            asyncio.to_thread(test_database_connection),
+            _warm_connections(session)
+        )
+        if not db_ok:
+            logger.error("✗ Aborting: Cannot connect to database")
+            sys.exit(1)
 
-    async with aiohttp.ClientSession() as session:
         # Discover NFL markets
         nfl_markets = await discover_nfl_markets(session, days_ahead=10)
 
@@ -360,23 +455,27 @@ async def main():
         all_markets = nfl_markets + nba_markets
 
         if all_markets:
-            print(f"\nInserting {len(all_markets)} total markets into database...")
-            print(f"  NFL: {len(nfl_markets)} markets")
-            print(f"  NBA: {len(nba_markets)} markets")
+            logger.info("\nInserting %s total markets into database...", len(all_markets))
+            logger.info("  NFL: %s markets", len(nfl_markets))
+            logger.info("  NBA: %s markets", len(nba_markets))
             try:
-                inserted = db.insert_active_markets(all_markets)
-                print(f"Successfully inserted {inserted} new markets")
+                inserted = await asyncio.to_thread(db.insert_active_markets, all_markets)
+                logger.info("Successfully inserted %s new markets", inserted)
             except Exception as e:
-                print(f"Error inserting markets: {e}")
+                logger.error("Error inserting markets: %s", e)
         else:
-            print("No new markets found")
+            logger.info("No new markets found")
 
-    # Cleanup old markets
-    await cleanup_old_markets()
+        # Cleanup old markets
+        await cleanup_old_markets()
 
-    print("\nDiscovery complete")
-    print("=" * 60)
+    logger.info("\nDiscovery complete")
+    logger.info("=" * 60)
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    listener = setup_logging()
+    try:
+        run(main())
+    finally:
+        listener.stop()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Team Mappings Generator
+
+Regenerates backend/app/team_mappings_data.py from the TEAM_ID_MAP tables in
+the basketball and football service modules. The generated module holds plain
+dict literals so consumers of get_polymarket_abbrev() don't have to import the
+service modules or rebuild the lookups at import time.
+
+Re-run whenever a TEAM_ID_MAP changes.
+
+Usage:
+    python backend/scripts/generate_team_mappings.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add backend to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+OUTPUT_PATH = Path(__file__).resolve().parents[1] / "app" / "team_mappings_data.py"
+
+HEADER = '''"""
+Generated by backend/scripts/generate_team_mappings.py - do not edit by hand.
+
+Full team name -> Polymarket abbreviation lookups built from the service
+modules' TEAM_ID_MAP tables.
+"""'''
+
+
+def render_mapping(name: str, team_id_map: dict) -> str:
+    """Render a Full Name -> Polymarket Abbreviation dict literal."""
+    lines = [f"{name} = {{"]
+    for _, (full_name, _, poly_abbrev) in team_id_map.items():
+        lines.append(f"    {json.dumps(full_name)}: {json.dumps(poly_abbrev)},")
+    lines.append("}")
+    return "\n".join(lines)
+
+
+def render_module(nba_team_id_map: dict, nfl_team_id_map: dict) -> str:
+    """Render the full team_mappings_data.py source."""
+    return "\n\n".join([
+        HEADER,
+        render_mapping("NBA_NAME_TO_POLYMARKET", nba_team_id_map),
+        render_mapping("NFL_NAME_TO_POLYMARKET", nfl_team_id_map),
+    ]) + "\n"
+
+
+def main():
+    from backend.services.basketball_api import TEAM_ID_MAP as NBA_TEAM_ID_MAP
+    from backend.services.football_api import TEAM_ID_MAP as NFL_TEAM_ID_MAP
+
+    OUTPUT_PATH.write_text(render_module(NBA_TEAM_ID_MAP, NFL_TEAM_ID_MAP))
+    print(f"Wrote {OUTPUT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,140 +16,151 @@ sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
 import asyncio
 import aiohttp
-from datetime import datetime
-from zoneinfo import ZoneInfo
+import json
+import orjson
+from datetime import datetime, timezone
 
 # Import service APIs
 from backend.services import polymarket_api
+from backend.services.http_client import create_session, run
 from backend.app import db
 
+# Caps markets in flight at once so large batches don't pile up waiting on
+# polymarket_api's global limiter (which still enforces the 20 req/s cap)
+_tracking_semaphore = asyncio.Semaphore(16)
 
-async def track_market_price(session: aiohttp.ClientSession, market: dict) -> bool:
-    """
-    Fetch and store current price for a single market.
+# slug -> clob token ids for markets without a stored clob_token_id. Market
+# metadata never changes for a slug, so it is persisted across cron runs and
+# only fetched once per market.
+_META_CACHE_PATH = Path(__file__).resolve().parents[2] / ".cache" / "polymarket_meta.json"
+_META_CACHE: dict[str, list[str]] = {}
 
-    Args:
-        session: aiohttp session
-        market: Market dict from database
 
-    Returns:
-        True if successful, False otherwise
-    """
+def load_meta_cache():
+    """Load the slug -> clob token ids cache from disk."""
     try:
-        # Extract team names from polymarket_slug
-        # Format: "nfl-giants-broncos-2024-11-08" or "nba-lal-bos-2024-12-25"
-        slug_parts = market['polymarket_slug'].split('-')
-        sport = slug_parts[0]
+        with _META_CACHE_PATH.open() as f:
+            _META_CACHE.update(json.load(f))
+    except (OSError, ValueError):
+        pass
 
-        # Find the date (YYYY-MM-DD pattern at end)
-        # Last 3 parts are year-month-day
-        date_str = '-'.join(slug_parts[-3:])
 
-        # Team names are between sport and date
-        team_parts = slug_parts[1:-3]
-
-        # Split teams (try to find middle point)
-        # This is tricky - Polymarket may have team names with hyphens
-        # Use game_date from market data as authoritative source
-
-        # Simpler approach: Use the market data we already have
-        # Extract from the slug or use a different method
-
-        # For now, let's fetch price using market_id directly
-        # We'll need to modify get_current_price to accept market_id
-
-        # Alternative: Parse slug more carefully
-        # NFL teams are typically 1 word abbreviations
-        # NBA teams are 2-4 letter abbreviations
+def save_meta_cache(active_slugs: set[str]):
+    """Write the slug -> clob token ids cache to disk, dropping inactive markets."""
+    try:
+        _META_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with _META_CACHE_PATH.open("w") as f:
+            json.dump({slug: tokens for slug, tokens in _META_CACHE.items() if slug in active_slugs}, f)
+    except OSError as e:
+        print(f"Error saving market metadata cache: {e}")
 
-        # Let's reconstruct from market data
-        sport = market['sport'].lower()
-        game_date = market['game_date']
 
-        # For simplicity, extract from slug
-        # Assuming format: sport-away-home-YYYY-MM-DD
-        # We need to handle multi-word team names
+async def track_market_price(session: aiohttp.ClientSession, market: dict, cycle_ts: int) -> dict | None:
+    """
+    Fetch current price for a single market.
 
-        # Better approach: Use market_id to fetch price directly
-        # But Polymarket API requires slug format
+    Args:
+        session: aiohttp session
+        market: Market dict from database
+        cycle_ts: Unix timestamp shared by every snapshot in this tracking cycle
 
-        # Use the polymarket_slug directly with a new helper function
-        current_price = await get_price_by_slug(session, market['polymarket_slug'])
+    Returns:
+        Price snapshot dict for db.insert_price_snapshots, or None on failure
+    """
+    try:
+        # Token id is stored at discovery time; markets discovered before that
+        # column existed fall back to a (cached) slug lookup
+        clob_token_id = market.get('clob_token_id') or await _get_clob_token_id(session, market['polymarket_slug'])
+        current_price = await _fetch_price_only(session, clob_token_id, cycle_ts)
 
         if current_price and current_price.get('away_price') is not None:
-            # Store price snapshot
-            now = datetime.now(ZoneInfo("UTC"))
-            success = db.insert_price_snapshot(
-                market_id=market['market_id'],
-                timestamp=now,
-                away_price=current_price['away_price'],
-                home_price=current_price['home_price']
-            )
-
-            if success:
-                print(f"  ✓ {market['polymarket_slug']}: away={current_price['away_price']:.3f}, home={current_price['home_price']:.3f}")
-                return True
-            else:
-                print(f"  ✗ Failed to store: {market['polymarket_slug']}")
-                return False
+            # Snapshot is stored in bulk by main() at the end of the cycle
+            print(f"  ✓ {market['polymarket_slug']}: away={current_price['away_price']:.3f}, home={current_price['home_price']:.3f}")
+            return {
+                'market_id': market['market_id'],
+                'timestamp': datetime.fromtimestamp(cycle_ts, timezone.utc),
+                'away_price': current_price['away_price'],
+                'home_price': current_price['home_price']
+            }
         else:
             print(f"  ✗ No price data: {market['polymarket_slug']}")
-            return False
+            return None
 
     except Exception as e:
         print(f"  ✗ Error tracking {market.get('polymarket_slug', 'unknown')}: {e}")
-        return False
+        return None
+
 
+async def _track_market_price_bounded(session: aiohttp.ClientSession, market: dict, cycle_ts: int) -> dict | None:
+    """Run track_market_price under the tracking semaphore."""
+    async with _tracking_semaphore:
+        return await track_market_price(session, market, cycle_ts)
 
-async def get_price_by_slug(session: aiohttp.ClientSession, slug: str) -> dict:
+
+async def _get_clob_token_id(session: aiohttp.ClientSession, slug: str) -> str:
     """
-    Get current price for a market using its slug directly.
+    Look up the first clob token id for a market slug, using the metadata cache.
 
     Args:
         session: aiohttp session
         slug: Polymarket slug (e.g., "nfl-giants-broncos-2024-11-08")
 
     Returns:
-        Dict with away_price, home_price, timestamp or empty dict on error
+        CLOB token id of the first outcome
     """
-    try:
+    clobIdTokens = _META_CACHE.get(slug)
+    if clobIdTokens is None:
         market_url = f"https://gamma-api.polymarket.com/markets/slug/{slug}"
-        price_url = "https://clob.polymarket.com/prices-history"
-
-        # Get market metadata
         async with polymarket_api._polymarket_semaphore:
             data = await polymarket_api._rate_limited_get(session, market_url)
+        clobIdTokens = orjson.loads(data["clobTokenIds"])
+        _META_CACHE[slug] = clobIdTokens
 
-            import json
-            clobIdTokens = json.loads(data["clobTokenIds"])
+    return clobIdTokens[0]
 
-            # Get current price (last 2 minutes)
-            now_ts = int(datetime.now().timestamp())
-            start_ts = now_ts - 120
 
-            queryString = {
-                "market": clobIdTokens[0],
-                "startTs": start_ts,
-                "endTs": now_ts
-            }
+async def _fetch_price_only(session: aiohttp.ClientSession, clob_token_id: str, now_ts: int) -> dict:
+    """
+    Get current price for a market from the CLOB prices-history endpoint.
+
+    Args:
+        session: aiohttp session
+        clob_token_id: CLOB token id of the market's first outcome
+        now_ts: Unix timestamp to read the price at (end of the history window)
+
+    Returns:
+        Dict with away_price, home_price, timestamp or empty dict on error
+    """
+    try:
+        price_url = "https://clob.polymarket.com/prices-history"
+
+        # Get current price (last 2 minutes)
+        start_ts = now_ts - 120
+
+        queryString = {
+            "market": clob_token_id,
+            "startTs": start_ts,
+            "endTs": now_ts
+        }
 
+        async with polymarket_api._polymarket_semaphore:
             info = await polymarket_api._rate_limited_get(session, price_url, params=queryString)
 
-            if not info.get("history"):
-                return {}
+        if not info.get("history"):
+            return {}
 
-            # Get most recent price
-            price_first = info["history"][-1]["p"]
-            price_second = 1.0 - price_first
+        # Get most recent price
+        price_first = info["history"][-1]["p"]
+        price_second = 1.0 - price_first
 
-            return {
-                "away_price": price_first,
-                "home_price": price_second,
-                "timestamp": now_ts
-            }
+        return {
+            "away_price": price_first,
+            "home_price": price_second,
+            "timestamp": now_ts
+        }
 
     except Exception as e:
-        print(f"    Error fetching price for {slug}: {e}")
+        print(f"    Error fetching price for token {clob_token_id}: {e}")
         return {}
 
 
@@ -161,7 +172,7 @@ async def main():
     print("=" * 60)
 
     # Get all active markets from database
-    active_markets = db.get_active_markets(status='open')
+    active_markets = await asyncio.to_thread(db.get_active_markets, status='open')
 
     if not active_markets:
         print("No active markets to track")
@@ -171,13 +182,29 @@ async def main():
     print(f"Tracking {len(active_markets)} active markets...")
     print()
 
-    async with aiohttp.ClientSession() as session:
-        # Track all markets concurrently (with rate limiting handled by polymarket_api)
-        tasks = [track_market_price(session, market) for market in active_markets]
+    load_meta_cache()
+
+    # One timestamp for the whole cycle so snapshots line up on the 5-minute grid
+    cycle_ts = int(datetime.now(timezone.utc).timestamp())
+
+    async with create_session() as session:
+        # Track markets concurrently, at most 16 in flight
+        # (request rate limiting is handled by polymarket_api)
+        tasks = [_track_market_price_bounded(session, market, cycle_ts) for market in active_markets]
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
+    save_meta_cache({market['polymarket_slug'] for market in active_markets})
+
+    # Store all snapshots from this cycle in one insert
+    snapshots = [r for r in results if isinstance(r, dict)]
+    try:
+        await asyncio.to_thread(db.insert_price_snapshots, snapshots)
+    except Exception as e:
+        print(f"✗ Failed to store {len(snapshots)} price snapshots: {e}")
+        snapshots = []
+
     # Summary
-    successful = sum(1 for r in results if r is True)
+    successful = len(snapshots)
     failed = len(results) - successful
 
     print()
@@ -187,4 +214,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    run(main())
@@ -14,10 +14,41 @@ from pathlib import Path
 # Add backend to path for imports
 sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
 
+from concurrent.futures import ThreadPoolExecutor
+
 from backend.app.db import SessionLocal, NBAGameFeatures, NFLGameFeatures, MLBGameFeatures
 from sqlalchemy import func
 
 
+def season_breakdown(model, *extra_columns):
+    """
+    One GROUP BY season query returning count and date range per season.
+
+    Uses its own session so the sports can be queried from separate threads.
+
+    Returns rows of (season, count, min(game_date), max(game_date), *extra_columns).
+    """
+    session = SessionLocal()
+    try:
+        return session.query(
+            model.season,
+            func.count(),
+            func.min(model.game_date),
+            func.max(model.game_date),
+            *extra_columns
+        ).group_by(model.season).order_by(model.season).all()
+    finally:
+        session.close()
+
+
+def column_range(rows, min_index: int, max_index: int) -> tuple:
+    """Overall (min, max) across season_breakdown rows, ignoring NULLs."""
+    return (
+        min((row[min_index] for row in rows if row[min_index] is not None), default=None),
+        max((row[max_index] for row in rows if row[max_index] is not None), default=None)
+    )
+
+
 def verify_database():
     """Query database and display statistics."""
 
@@ -25,31 +56,35 @@ def verify_database():
     print("DATABASE VERIFICATION")
     print("=" * 70 + "\n")
 
-    session = SessionLocal()
-
     try:
+        # Run the three sport aggregations concurrently, one connection each
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            nba_future = pool.submit(season_breakdown, NBAGameFeatures)
+            nfl_future = pool.submit(
+                season_breakdown, NFLGameFeatures,
+                func.min(NFLGameFeatures.week), func.max(NFLGameFeatures.week)
+            )
+            mlb_future = pool.submit(season_breakdown, MLBGameFeatures)
+
+            nba_by_season = nba_future.result()
+            nfl_by_season = nfl_future.result()
+            mlb_by_season = mlb_future.result()
+
         # NBA Statistics
         print("NBA (nba_games_features)")
         print("-" * 70)
 
-        nba_count = session.query(NBAGameFeatures).count()
+        nba_count = sum(row[1] for row in nba_by_season)
         print(f"  Total games: {nba_count}")
 
         if nba_count > 0:
-            # Get season breakdown
-            nba_by_season = session.query(
-                NBAGameFeatures.season,
-                func.count(NBAGameFeatures.game_id)
-            ).group_by(NBAGameFeatures.season).order_by(NBAGameFeatures.season).all()
-
             print(f"  Breakdown by season:")
-            for season, count in nba_by_season:
+            for season, count, _, _ in nba_by_season:
                 season_label = f"{season}-{str(season+1)[2:]}" if season else "Unknown"
                 print(f"    {season_label}: {count} games")
 
             # Date range
-            first_game = session.query(func.min(NBAGameFeatures.game_date)).scalar()
-            last_game = session.query(func.max(NBAGameFeatures.game_date)).scalar()
+            first_game, last_game = column_range(nba_by_season, 2, 3)
             print(f"  Date range: {first_game} to {last_game}")
 
         print()
@@ -58,28 +93,20 @@ def verify_database():
         print("NFL (nfl_games_features)")
         print("-" * 70)
 
-        nfl_count = session.query(NFLGameFeatures).count()
+        nfl_count = sum(row[1] for row in nfl_by_season)
         print(f"  Total games: {nfl_count}")
 
         if nfl_count > 0:
-            # Get season breakdown
-            nfl_by_season = session.query(
-                NFLGameFeatures.season,
-                func.count(NFLGameFeatures.game_id)
-            ).group_by(NFLGameFeatures.season).order_by(NFLGameFeatures.season).all()
-
             print(f"  Breakdown by season:")
-            for season, count in nfl_by_season:
+            for season, count, _, _, _, _ in nfl_by_season:
                 print(f"    {season}: {count} games")
 
             # Week range
-            min_week = session.query(func.min(NFLGameFeatures.week)).scalar()
-            max_week = session.query(func.max(NFLGameFeatures.week)).scalar()
+            min_week, max_week = column_range(nfl_by_season, 4, 5)
             print(f"  Week range: Week {min_week} to Week {max_week}")
 
             # Date range
-            first_game = session.query(func.min(NFLGameFeatures.game_date)).scalar()
-            last_game = session.query(func.max(NFLGameFeatures.game_date)).scalar()
+            first_game, last_game = column_range(nfl_by_season, 2, 3)
             print(f"  Date range: {first_game} to {last_game}")
 
         print()
@@ -88,23 +115,16 @@ def verify_database():
         print("MLB (mlb_games_features)")
         print("-" * 70)
 
-        mlb_count = session.query(MLBGameFeatures).count()
+        mlb_count = sum(row[1] for row in mlb_by_season)
         print(f"  Total games: {mlb_count}")
 
         if mlb_count > 0:
-            # Get season breakdown
-            mlb_by_season = session.query(
-                MLBGameFeatures.season,
-                func.count(MLBGameFeatures.game_id)
-            ).group_by(MLBGameFeatures.season).order_by(MLBGameFeatures.season).all()
-
             print(f"  Breakdown by season:")
-            for season, count in mlb_by_season:
+            for season, count, _, _ in mlb_by_season:
                 print(f"    {season}: {count} games")
 
             # Date range
-            first_game = session.query(func.min(MLBGameFeatures.game_date)).scalar()
-            last_game = session.query(func.max(MLBGameFeatures.game_date)).scalar()
+            first_game, last_game = column_range(mlb_by_season, 2, 3)
             print(f"  Date range: {first_game} to {last_game}")
 
         print()
@@ -122,9 +142,6 @@ def verify_database():
 
     except Exception as e:
         print(f"✗ Error querying database: {e}")
-        session.rollback()
-    finally:
-        session.close()
 
 
 if __name__ == "__main__":
@@ -1,11 +1,14 @@
 import aiohttp
 import asyncio
+import contextlib
 import datetime as dt
+import numpy as np
 import pandas as pd
 from typing import List, Dict, Optional
 from tqdm.asyncio import tqdm_asyncio
 
 from . import polymarket_api as polyapi
+from .http_client import create_session, read_json, run_with_shared_session, single_flight
 
 # MLB team ID: (Full Name, [Unused - was Kalshi], Polymarket Abbreviation)
 TEAM_ID_MAP = {
@@ -41,9 +44,40 @@ TEAM_ID_MAP = {
     121: ("New York Mets", "NYM", "nym")
 }
 
+# MLB Stats API team id -> Polymarket abbreviation, built once instead of per game
+_POLY_BY_ID: Dict[int, str] = {team_id: info[2] for team_id, info in TEAM_ID_MAP.items()}
+
+# Stats kept from each team stats response, per group
+STAT_LISTS = {
+    "hitting": ["avg", "obp", "slg", "ops", "stolenBasePercentage", "babip", "groundOutsToAirouts", "atBatsPerHomeRun"],
+    "pitching": ["avg", "obp", "slg", "ops", "stolenBasePercentage", "era", "whip", "groundOutsToAirouts",
+                 "pitchesPerInning", "strikeoutsPer9Inn", "walksPer9Inn", "hitsPer9Inn", "runsScoredPer9", "homeRunsPer9"]
+}
+
+# Output schema (matches db.MLBGameFeatures minus sport/season)
+GAME_COLUMNS = ["game_id", "game_date", "away_team", "away_team_id", "home_team", "home_team_id"]
+STAT_COLUMNS = [
+    f"{side}_{group}_{stat}"
+    for side in ("away", "home")
+    for group in ("hitting", "pitching")
+    for stat in STAT_LISTS[group]
+]
+MARKET_COLUMNS = [
+    "polymarket_away_price",
+    "polymarket_home_price",
+    "polymarket_start_ts",
+    "polymarket_market_open_ts",
+    "polymarket_market_close_ts"
+]
+
+# (team_id, group, game_date) -> task resolving to that team's stats before game_date
+_team_stats_cache: Dict[tuple, asyncio.Future] = {}
+
+
 async def get_historical_data(start_date: dt.date, end_date: dt.date,
-                              max_concurrent: int = 10,
-                              fetch_market_data: bool = True) -> pd.DataFrame:
+                              max_concurrent: int = 16,
+                              fetch_market_data: bool = True,
+                              session: Optional[aiohttp.ClientSession] = None) -> pd.DataFrame:
     """Fetch historical MLB game data with team stats and optionally market data.
 
     Args:
@@ -51,15 +85,31 @@ async def get_historical_data(start_date: dt.date, end_date: dt.date,
         end_date: End date for game data
         max_concurrent: Maximum number of concurrent stat requests
         fetch_market_data: Whether to fetch Polymarket market data
+        session: Existing session to reuse (left open); a new one is created if omitted
     """
     
     # Get the schedule
     url = f"https://statsapi.mlb.com/api/v1/schedule?sportId=1&startDate={start_date.strftime('%Y-%m-%d')}&endDate={end_date.strftime('%Y-%m-%d')}"
     
-    async with aiohttp.ClientSession() as session:
+    # One keep-alive session for the schedule, all stat requests and market lookups.
+    # At most max_concurrent requests are in flight, so size the per-host pool for that.
+    session_context = contextlib.nullcontext(session) if session is not None else create_session(limit_per_host=max_concurrent)
+    async with session_context as session:
         async with session.get(url) as response:
-            schedule_data = await response.json()
-    
+            schedule_data = await read_json(response)
+
+        games_to_fetch = parse_schedule(schedule_data)
+
+        print(f"Found {len(games_to_fetch)} games to fetch")
+
+        # Fetch all stats with concurrency control
+        df = await fetch_all_game_stats(session, games_to_fetch, max_concurrent, fetch_market_data)
+
+    return df #.dropna() # occasionally, Polymarket api fails so get useless NaN vals
+
+
+def parse_schedule(schedule_data: Dict) -> List[Dict]:
+    """Extract the regular-season, non-doubleheader games to fetch from a schedule response."""
     # Parse games
     games_to_fetch = []
     for d in schedule_data.get("dates", []):
@@ -88,98 +138,104 @@ async def get_historical_data(start_date: dt.date, end_date: dt.date,
                 "home_id": home_team["id"]
             })
     
-    print(f"Found {len(games_to_fetch)} games to fetch")
-    
-    # Fetch all stats with concurrency control
-    async with aiohttp.ClientSession() as session:
-        rows = await fetch_all_game_stats(session, games_to_fetch, max_concurrent, fetch_market_data)
-
-    return pd.DataFrame(rows) #.dropna() # occasionally, Polymarket api fails so get useless NaN vals
+    return games_to_fetch
 
 
 async def fetch_all_game_stats(session: aiohttp.ClientSession,
                                games: List[Dict],
                                max_concurrent: int,
-                               fetch_market_data: bool) -> List[Dict]:
-    """Fetch stats for all games with concurrency control."""
+                               fetch_market_data: bool) -> pd.DataFrame:
+    """Fetch stats for all games with concurrency control.
+
+    Stat requests are deduplicated across games first (every game a team plays on a
+    date needs the same byDateRange stats) and fetched in one flat fan-out. Each game
+    then writes straight into preallocated column lists (one slot per game) rather
+    than building a dict per row.
+    """
+    columns = GAME_COLUMNS + STAT_COLUMNS + (MARKET_COLUMNS if fetch_market_data else [])
     if not games:
-        return []
+        return pd.DataFrame(columns=columns)
+
+    data = {col: [None] * len(games) for col in columns}
 
     semaphore = asyncio.Semaphore(max_concurrent)
 
-    async def fetch_with_limit(game):
+    # Unique (team_id, group, date) stat requests across all games
+    stat_keys = list({
+        (team_id, group, game["date"])
+        for game in games
+        for team_id in (game["away_id"], game["home_id"])
+        for group in STAT_LISTS
+    })
+
+    async def fetch_stats_with_limit(team_id, group, game_date):
         async with semaphore:
-            return await fetch_game_stats(session, game, fetch_market_data)
+            try:
+                return await fetch_team_stats(session, team_id, group, game_date)
+            except Exception as e:
+                print(f"Error fetching {group} stats for team {team_id} on {game_date}: {e}")
+                return {}
 
-    tasks = [fetch_with_limit(game) for game in games]
+    stat_results = await tqdm_asyncio.gather(
+        *[fetch_stats_with_limit(*key) for key in stat_keys],
+        desc="Fetching stats"
+    )
+    stats_map = dict(zip(stat_keys, stat_results))
+
+    async def fetch_with_limit(i, game):
+        async with semaphore:
+            return await fetch_game_stats(session, game, stats_map, fetch_market_data, data, i)
+
+    tasks = [fetch_with_limit(i, game) for i, game in enumerate(games)]
     results = await tqdm_asyncio.gather(*tasks, desc="Fetching games")
 
     # Filter out failures
-    rows = []
+    ok = []
     for i, result in enumerate(results):
-        if isinstance(result, dict):
-            rows.append(result)
+        if result is True:
+            ok.append(i)
         else:
             print(f"Error fetching game {games[i]['game_id']}: {result}")
 
-    return rows
+    stat_set = set(STAT_COLUMNS)
+    return pd.DataFrame({
+        col: np.asarray([values[i] for i in ok], dtype=np.float64) if col in stat_set else [values[i] for i in ok]
+        for col, values in data.items()
+    })
 
 
-async def fetch_game_stats(session: aiohttp.ClientSession, 
-                           game_info: Dict, 
-                           fetch_market: bool) -> Dict:
-    """Fetch all stats for a single game."""
+async def fetch_game_stats(session: aiohttp.ClientSession,
+                           game_info: Dict,
+                           stats_map: Dict[tuple, Dict],
+                           fetch_market: bool,
+                           data: Dict[str, list],
+                           i: int) -> bool:
+    """Write a single game's stats (from the prefetched stats_map) and market data into row i."""
     
     game_date = game_info["date"]
     away_id = game_info["away_id"]
     home_id = game_info["home_id"]
     
-    # Fetch 4 stat requests concurrently
-    tasks = [
-        fetch_team_stats(session, away_id, "hitting", game_date),
-        fetch_team_stats(session, away_id, "pitching", game_date),
-        fetch_team_stats(session, home_id, "hitting", game_date),
-        fetch_team_stats(session, home_id, "pitching", game_date)
-    ]
-    
-    try:
-        away_hitting, away_pitching, home_hitting, home_pitching = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Handle exceptions
-        if isinstance(away_hitting, Exception):
-            away_hitting = {}
-        if isinstance(away_pitching, Exception):
-            away_pitching = {}
-        if isinstance(home_hitting, Exception):
-            home_hitting = {}
-        if isinstance(home_pitching, Exception):
-            home_pitching = {}
-    except Exception as e:
-        print(f"Error fetching stats for game {game_info['game_id']}: {e}")
-        away_hitting = away_pitching = home_hitting = home_pitching = {}
-    
-    # Build row
-    row = {
-        "game_id": game_info["game_id"],
-        "game_date": game_info["date"],
-        "away_team": game_info["away"],
-        "away_team_id": game_info["away_id"],
-        "home_team": game_info["home"],
-        "home_team_id": game_info["home_id"]
-    }
-    
-    flatten_stats(row, away_hitting, "away_hitting")
-    flatten_stats(row, away_pitching, "away_pitching")
-    flatten_stats(row, home_hitting, "home_hitting")
-    flatten_stats(row, home_pitching, "home_pitching")
+    # Fill row
+    data["game_id"][i] = game_info["game_id"]
+    data["game_date"][i] = game_info["date"]
+    data["away_team"][i] = game_info["away"]
+    data["away_team_id"][i] = game_info["away_id"]
+    data["home_team"][i] = game_info["home"]
+    data["home_team_id"][i] = game_info["home_id"]
+
+    write_stats(data, i, stats_map.get((away_id, "hitting", game_date), {}), "away_hitting")
+    write_stats(data, i, stats_map.get((away_id, "pitching", game_date), {}), "away_pitching")
+    write_stats(data, i, stats_map.get((home_id, "hitting", game_date), {}), "home_hitting")
+    write_stats(data, i, stats_map.get((home_id, "pitching", game_date), {}), "home_pitching")
     
     # Fetch market data if requested
     if fetch_market:
-        away_poly = TEAM_ID_MAP.get(away_id, (None, None, None))[2]
-        home_poly = TEAM_ID_MAP.get(home_id, (None, None, None))[2]
+        away_poly = _POLY_BY_ID.get(away_id)
+        home_poly = _POLY_BY_ID.get(home_id)
 
         if away_poly and home_poly:
-            market_data = await polyapi.get_opening_price(
+            market_data = await polyapi.get_opening_price_cached(
                 session,
                 sport="mlb",
                 date=game_date,
@@ -187,20 +243,34 @@ async def fetch_game_stats(session: aiohttp.ClientSession,
                 home_team=home_poly
             )
 
-            row["polymarket_away_price"] = market_data.get("away_price")
-            row["polymarket_home_price"] = market_data.get("home_price")
-            row["polymarket_start_ts"] = market_data.get("start_ts")
-            row["polymarket_market_open_ts"] = market_data.get("market_open_ts")
-            row["polymarket_market_close_ts"] = market_data.get("market_close_ts")
+            data["polymarket_away_price"][i] = market_data.get("away_price")
+            data["polymarket_home_price"][i] = market_data.get("home_price")
+            data["polymarket_start_ts"][i] = market_data.get("start_ts")
+            data["polymarket_market_open_ts"][i] = market_data.get("market_open_ts")
+            data["polymarket_market_close_ts"][i] = market_data.get("market_close_ts")
     
-    return row
+    return True
 
 
-async def fetch_team_stats(session: aiohttp.ClientSession, 
-                           team_id: int, 
-                           group: str, 
+async def fetch_team_stats(session: aiohttp.ClientSession,
+                           team_id: int,
+                           group: str,
                            game_date: dt.date) -> Dict:
-    """Fetch stats for a single team/group/date combination."""
+    """Fetch stats for a single team/group/date combination.
+
+    Results are shared per (team_id, group, game_date): every game a team plays
+    on a date needs the same byDateRange stats, so concurrent and repeated calls
+    reuse one request. Empty results (errors) aren't kept, so they get retried.
+    """
+    return await single_flight(_team_stats_cache, (team_id, group, game_date),
+                               lambda: _fetch_team_stats_uncached(session, team_id, group, game_date))
+
+
+async def _fetch_team_stats_uncached(session: aiohttp.ClientSession,
+                                     team_id: int,
+                                     group: str,
+                                     game_date: dt.date) -> Dict:
+    """Fetch stats for a single team/group/date combination from the MLB stats API."""
     
     year_begin = dt.date(game_date.year, 1, 1).strftime("%m/%d/%Y")
     day_before = (game_date - dt.timedelta(days=1)).strftime("%m/%d/%Y")
@@ -210,7 +280,7 @@ async def fetch_team_stats(session: aiohttp.ClientSession,
     try:
         async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
             response.raise_for_status()
-            data = await response.json()
+            data = await read_json(response)
             
             if not data.get("stats") or not data["stats"][0].get("splits"):
                 return {}
@@ -222,12 +292,8 @@ async def fetch_team_stats(session: aiohttp.ClientSession,
         return {}
     
     # Extract relevant stats
-    if group == "hitting":
-        stat_list = ["avg", "obp", "slg", "ops", "stolenBasePercentage", "babip", "groundOutsToAirouts", "atBatsPerHomeRun"]
-    elif group == "pitching":
-        stat_list = ["avg", "obp", "slg", "ops", "stolenBasePercentage", "era", "whip", "groundOutsToAirouts", 
-                     "pitchesPerInning", "strikeoutsPer9Inn", "walksPer9Inn", "hitsPer9Inn", "runsScoredPer9", "homeRunsPer9"]
-    else:
+    stat_list = STAT_LISTS.get(group)
+    if stat_list is None:
         return {}
     
     result = {}
@@ -241,15 +307,15 @@ async def fetch_team_stats(session: aiohttp.ClientSession,
     return result
 
 
-def flatten_stats(row_dict: Dict, stats_dict: Dict, prefix: str) -> None:
-    """Add stats from stats_dict to row_dict with the given prefix."""
+def write_stats(data: Dict[str, list], i: int, stats_dict: Dict, prefix: str) -> None:
+    """Write stats from stats_dict into row i of the prefixed columns."""
     for stat, value in stats_dict.items():
-        row_dict[f"{prefix}_{stat}"] = value
+        data[f"{prefix}_{stat}"][i] = value
 
 
 def get_historical_data_sync(start_date: dt.date, end_date: dt.date, fetch_market_data: bool = True) -> pd.DataFrame:
-    """Synchronous wrapper for the async function."""
-    return asyncio.run(get_historical_data(start_date, end_date, fetch_market_data=fetch_market_data))
+    """Synchronous wrapper for the async function (shares one loop and session across calls)."""
+    return run_with_shared_session(get_historical_data, start_date, end_date, fetch_market_data=fetch_market_data)
 
 
 if __name__ == "__main__":
@@ -1,12 +1,17 @@
 import aiohttp
 import asyncio
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
+import contextlib
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+import numpy as np
 import pandas as pd
 from typing import List, Dict, Optional
-from tqdm.asyncio import tqdm_asyncio
+from tqdm import tqdm
 
+from . import espn
 from . import polymarket_api as polyapi
+from .espn import ET, MARKET_COLUMNS, PROGRESS_INTERVAL
+from .http_client import create_session, get_json_cached, run_with_shared_session
 
 # NBA team ID: (Full Name, [Unused], Polymarket Abbreviation)
 TEAM_ID_MAP = {
@@ -42,295 +47,358 @@ TEAM_ID_MAP = {
     30: ("Charlotte Hornets", "---", "cha")
 }
 
+_POLY_BY_ID: Dict[int, str] = espn.poly_abbreviations(TEAM_ID_MAP)
 
-async def fetch_schedule_for_team(session: aiohttp.ClientSession, team_id: int, season_year: int) -> List[Dict]:
-    """Fetch schedule for a specific team and season. Returns list of game dicts.
+
+def _current_season_year() -> int:
+    """Season year (second year, e.g. 2025 for 2024-2025) of the season in progress or last finished."""
+    today = datetime.now(ET).date()
+    return today.year + 1 if today.month >= 10 else today.year
+
+
+def _schedule_ttl(season_year: int) -> int:
+    return espn.schedule_ttl(season_year, _current_season_year())
+
+
+@dataclass(slots=True)
+class ScheduledGame:
+    """One regular-season game from the schedule (slots instead of a per-game dict)."""
+    game_id: str
+    date: date
+    season_year: int
+    away_id: int
+    home_id: int
+    away_name: str
+    home_name: str
+
+
+def _season_months(season_year: int) -> List[tuple]:
+    """(first_day, last_day) of each month that can hold regular-season games of a season.
+
+    Covers October of the first year through August of the second, which includes the
+    shifted 2019-20 and 2020-21 calendars.
+    """
+    months = []
+    year, month = season_year - 1, 10
+    while (year, month) <= (season_year, 8):
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        months.append((date(year, month, 1), date(next_year, next_month, 1) - timedelta(days=1)))
+        year, month = next_year, next_month
+    return months
+
+
+def _parse_scoreboard_event(event: Dict, season_year: int) -> Optional[ScheduledGame]:
+    """Build a ScheduledGame from a scoreboard event, or None if it isn't a valid regular-season game."""
+    # Filter to regular season games of the requested season only
+    season = event.get("season", {})
+    if season.get("type") != 2 or season.get("year") != season_year:  # 2 = regular season
+        return None
+
+    # Get event details
+    event_id = event.get("id")
+    game_date_str = event.get("date")
+    if not event_id or not game_date_str:
+        return None
+
+    # Get competition data
+    competitions = event.get("competitions", [])
+    if not competitions:
+        return None
+
+    # Extract home and away teams in one pass
+    sides = {c.get("homeAway"): c for c in competitions[0].get("competitors", [])}
+    home_team = sides.get("home")
+    away_team = sides.get("away")
+    if not home_team or not away_team:
+        return None
+
+    try:
+        return ScheduledGame(
+            game_id=event_id,
+            # Convert the UTC start to US Eastern time to get the correct local game date
+            date=espn.et_game_date(game_date_str),
+            season_year=season_year,
+            away_id=int(away_team["id"]),
+            home_id=int(home_team["id"]),
+            away_name=away_team.get("team", {}).get("displayName", "Unknown"),
+            home_name=home_team.get("team", {}).get("displayName", "Unknown")
+        )
+    except (ValueError, KeyError) as e:
+        print(f"Error parsing game {event_id}: {e}")
+        return None
+
+
+async def fetch_scoreboard_games(session: aiohttp.ClientSession, start_date: date, end_date: date,
+                                 season_year: int) -> List[ScheduledGame]:
+    """Fetch every regular-season game between two dates from the league-wide scoreboard.
+
+    Unlike per-team schedules, each game appears exactly once.
 
     Args:
-        team_id: ESPN team ID (1-30)
+        start_date: First date (inclusive)
+        end_date: Last date (inclusive)
         season_year: The second year of the season (e.g., 2024 for 2023-2024 season)
     """
-    url = f"https://site.api.espn.com/apis/site/v2/sports/basketball/nba/teams/{team_id}/schedule?season={season_year}"
+    # The scoreboard accepts a YYYYMMDD-YYYYMMDD range; limit lifts the default page size
+    url = (
+        "https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard"
+        f"?dates={start_date.strftime('%Y%m%d')}-{end_date.strftime('%Y%m%d')}&limit=1000"
+    )
 
     try:
-        async with session.get(url) as response:
-            data = await response.json()
+        data = await get_json_cached(session, url, _schedule_ttl(season_year)) or {}
 
-        events = data.get("events", [])
         games = []
-
-        for event in events:
-            # Filter to regular season only
-            season_type = event.get("seasonType", {})
-            if season_type.get("id") != "2":  # "2" is regular season
-                continue
-
-            # Get event details
-            event_id = event.get("id")
-            if not event_id:
-                continue
-
-            # Get competition data
-            competitions = event.get("competitions", [])
-            if not competitions or len(competitions) == 0:
-                continue
-
-            competition = competitions[0]
-            competitors = competition.get("competitors", [])
-
-            if len(competitors) < 2:
-                continue
-
-            # Extract home and away teams
-            home_team = next((c for c in competitors if c.get("homeAway") == "home"), None)
-            away_team = next((c for c in competitors if c.get("homeAway") == "away"), None)
-
-            if not home_team or not away_team:
-                continue
-
-            try:
-                # Parse game date
-                game_date_str = event.get("date")
-                if not game_date_str:
-                    continue
-
-                # Parse as UTC datetime
-                game_datetime_utc = datetime.fromisoformat(game_date_str.replace("Z", "+00:00"))
-                # Convert to US Eastern time to get the correct local game date
-                game_datetime_et = game_datetime_utc.astimezone(ZoneInfo("America/New_York"))
-                game_date = game_datetime_et.date()
-
-                # Get season year from event
-                season = event.get("season", {}).get("year", season_year)
-
-                games.append({
-                    "game_id": event_id,
-                    "date": game_date,
-                    "season_year": season,
-                    "away_id": int(away_team["id"]),
-                    "home_id": int(home_team["id"]),
-                    "away_name": away_team.get("team", {}).get("displayName", "Unknown"),
-                    "home_name": home_team.get("team", {}).get("displayName", "Unknown")
-                })
-            except (ValueError, KeyError) as e:
-                print(f"Error parsing game {event_id}: {e}")
-                continue
+        for event in data.get("events", []):
+            game = _parse_scoreboard_event(event, season_year)
+            if game is not None:
+                games.append(game)
 
         return games
     except Exception as e:
-        print(f"Error fetching schedule for team {team_id}, season {season_year}: {e}")
+        print(f"Error fetching scoreboard for {start_date} to {end_date}: {e}")
         return []
 
 
-async def fetch_team_game_stats(session: aiohttp.ClientSession, event_id: str, team_id: int) -> Dict[str, float]:
-    """Fetch team statistics for a specific game. Returns dict of stat_name: value."""
-    url = f"https://site.api.espn.com/apis/site/v2/sports/basketball/nba/summary?event={event_id}"
-
-    # Whitelist of statistics to keep (good for similarity analysis)
-    ALLOWED_STATS = {
-        # Shooting efficiency
-        "fieldGoalPct",
-        "threePointFieldGoalPct",
-        "freeThrowPct",
-        # Rebounds
-        "totalRebounds",
-        "offensiveRebounds",
-        "defensiveRebounds",
-        # Playmaking
-        "assists",
-        "turnovers",
-        # Defense
-        "steals",
-        "blocks",
-        # Discipline
-        "fouls",
-        # Scoring patterns
-        "fastBreakPoints",
-        "pointsInPaint"
-    }
+# Whitelist of statistics to keep (good for similarity analysis)
+ALLOWED_STATS = frozenset({
+    # Shooting efficiency
+    "fieldGoalPct",
+    "threePointFieldGoalPct",
+    "freeThrowPct",
+    # Rebounds
+    "totalRebounds",
+    "offensiveRebounds",
+    "defensiveRebounds",
+    # Playmaking
+    "assists",
+    "turnovers",
+    # Defense
+    "steals",
+    "blocks",
+    # Discipline
+    "fouls",
+    # Scoring patterns
+    "fastBreakPoints",
+    "pointsInPaint"
+})
+
+# Fixed column order for the per-team stat matrices
+STAT_NAMES = sorted(ALLOWED_STATS)
+_STAT_INDEX = {stat_name: col for col, stat_name in enumerate(STAT_NAMES)}
+
+# Output schema (matches db.NBAGameFeatures minus sport)
+GAME_COLUMNS = ["game_id", "game_date", "season", "away_team", "away_team_id", "home_team", "home_team_id"]
+AWAY_STAT_COLUMNS = [f"away_{stat_name}" for stat_name in STAT_NAMES]
+HOME_STAT_COLUMNS = [f"home_{stat_name}" for stat_name in STAT_NAMES]
+STAT_COLUMNS = AWAY_STAT_COLUMNS + HOME_STAT_COLUMNS
+
+# Explicit dtypes so pandas skips inference (see espn.MARKET_COLUMNS for the market columns)
+COLUMN_DTYPES = {
+    "season": np.int64,
+    "away_team_id": np.int64,
+    "home_team_id": np.int64,
+    **{col: np.float64 for col in STAT_COLUMNS + MARKET_COLUMNS}
+}
 
-    try:
-        async with session.get(url) as response:
-            data = await response.json()
-
-        teams = data.get("boxscore", {}).get("teams", [])
-
-        # Find the team by ID
-        team_data = None
-        for team in teams:
-            if team.get("team", {}).get("id") == str(team_id):
-                team_data = team
-                break
-
-        if not team_data:
-            return {}
-
-        # Extract only whitelisted statistics
-        statistics = team_data.get("statistics", [])
-        stats_dict = {}
-
-        for stat in statistics:
-            stat_name = stat.get("name")
-            stat_value = stat.get("displayValue")  # Basketball API uses displayValue
-
-            # Only process whitelisted stats
-            if stat_name in ALLOWED_STATS and stat_value is not None:
-                # Try to convert to float, skip if it's a string like "-" or "N/A"
-                if isinstance(stat_value, (int, float)):
-                    stats_dict[stat_name] = float(stat_value)
-                elif isinstance(stat_value, str) and stat_value not in ["-", "N/A", "", "--"]:
-                    try:
-                        stats_dict[stat_name] = float(stat_value)
-                    except ValueError:
-                        # Skip non-numeric values
-                        pass
-
-        return stats_dict
-    except Exception as e:
-        print(f"Error fetching stats for event {event_id}, team {team_id}: {e}")
-        return {}
+
+async def fetch_game_team_stats(session: aiohttp.ClientSession, event_id: str) -> Dict[int, Dict[str, float]]:
+    """Both teams' statistics for a game, shared across concurrent and repeated calls."""
+    # The basketball summary puts the number in displayValue
+    return await espn.fetch_game_team_stats(session, "basketball/nba", event_id, ALLOWED_STATS, "displayValue")
 
 
-def get_team_cumulative_stats(team_id: int, season_year: int, before_date,
-                              schedules_cache: Dict, stats_cache: Dict) -> Dict[str, Optional[float]]:
-    """Calculate cumulative per-game stats for a team up to (not including) a specific date.
+def build_team_stat_matrices(schedules_cache: Dict, stats_cache: Dict) -> Dict:
+    """Lay out each team-season's per-game stats as date-sorted NumPy prefix sums.
 
     Args:
-        team_id: ESPN team ID
-        season_year: The second year of the season (e.g., 2024 for 2023-2024 season)
-        before_date: Calculate stats for all games before this date
         schedules_cache: Pre-fetched schedules dict {(team_id, season): [games]}
         stats_cache: Pre-fetched stats dict {(game_id, team_id): stats_dict}
+
+    Returns:
+        Dict {(team_id, season): (dates, value_sums, present_sums, game_counts)} where row k
+        of each prefix array covers the team's first k games (row 0 is all zeros). value_sums
+        and present_sums are (n_games + 1, len(STAT_NAMES)); missing stats count as 0.
     """
+    matrices = {}
+
+    # Schedules arrive sorted by date from get_historical_data
+    for (team_id, season), games in schedules_cache.items():
+        dates = np.array([game.date for game in games], dtype="datetime64[D]")
+        values = np.zeros((len(games), len(STAT_NAMES)))
+        present = np.zeros((len(games), len(STAT_NAMES)), dtype=bool)
+
+        for row, game in enumerate(games):
+            # Stats are already whitelisted, so every key has a column
+            for stat_name, stat_value in stats_cache.get((game.game_id, team_id), {}).items():
+                col = _STAT_INDEX[stat_name]
+                values[row, col] = stat_value
+                present[row, col] = True
+
+        # Prefix sums with a leading zero row: row k covers the first k games
+        value_sums = np.vstack([np.zeros((1, len(STAT_NAMES))), np.cumsum(values, axis=0)])
+        present_sums = np.vstack([np.zeros((1, len(STAT_NAMES)), dtype=int), np.cumsum(present, axis=0)])
+        game_counts = np.concatenate([[0], np.cumsum(present.any(axis=1))])
+
+        matrices[(team_id, season)] = (dates, value_sums, present_sums, game_counts)
+
+    return matrices
+
+
+def compute_cumulative_stats(games: List[ScheduledGame], team_matrices: Dict) -> Dict:
+    """Cumulative per-game stats for every (team, date) the given games need, in one sweep.
+
+    Groups the requested dates per team-season, locates them all with a single
+    np.searchsorted call and reads the precomputed prefix sums.
+
+    Args:
+        games: Games to build rows for
+        team_matrices: Output of build_team_stat_matrices()
 
-    # Get all games for this team from cache
-    cache_key = (team_id, season_year)
-    all_games = schedules_cache.get(cache_key, [])
+    Returns:
+        Dict {(team_id, season, date): averages} where averages is a list ordered like
+        STAT_NAMES (NaN for stats never seen), or None if the team had no prior games.
+    """
+    needed = {}
+    for game in games:
+        for team_id in (game.away_id, game.home_id):
+            needed.setdefault((team_id, game.season_year), set()).add(game.date)
 
-    # Filter to games before the target date
-    previous_games = [game for game in all_games if game["date"] < before_date]
+    cumulative = {}
+    for (team_id, season), dates_needed in needed.items():
+        dates_needed = sorted(dates_needed)
+        entry = team_matrices.get((team_id, season))
+        if entry is None:
+            cumulative.update({(team_id, season, d): None for d in dates_needed})
+            continue
 
-    if not previous_games:
-        # No previous games found, return empty stats
-        return {}
+        dates, value_sums, present_sums, game_counts = entry
 
-    # Aggregate stats from cache
-    stat_totals = {}
-    games_with_stats = 0
+        n_previous = np.searchsorted(dates, np.array(dates_needed, dtype="datetime64[D]"))
 
-    for game in previous_games:
-        game_id = game["game_id"]
-        stats_key = (game_id, team_id)
+        # Averages for every requested date at once, NaN where a stat was never seen
+        counts = game_counts[n_previous]
+        averages = np.where(present_sums[n_previous] > 0,
+                            value_sums[n_previous] / np.maximum(counts, 1)[:, None],
+                            np.nan).tolist()
 
-        game_stats = stats_cache.get(stats_key, {})
+        for d, count, row_averages in zip(dates_needed, counts.tolist(), averages):
+            cumulative[(team_id, season, d)] = row_averages if count else None
 
-        if game_stats:
-            games_with_stats += 1
-            for stat_name, stat_value in game_stats.items():
-                if stat_name not in stat_totals:
-                    stat_totals[stat_name] = 0.0
-                stat_totals[stat_name] += stat_value
+    return cumulative
 
-    if games_with_stats == 0:
-        return {}
 
-    # Calculate per-game averages
-    per_game_stats = {}
-    for stat_name, total in stat_totals.items():
-        per_game_stats[stat_name] = total / games_with_stats
+def write_game_row(game_info: ScheduledGame, cumulative_stats: Dict,
+                   data: Dict[str, list], i: int) -> bool:
+    """Write a single game's info and cumulative team stats into row i of the column lists."""
 
-    return per_game_stats
+    event_id = game_info.game_id
+    game_date = game_info.date
+    away_id = game_info.away_id
+    home_id = game_info.home_id
+    season_year = game_info.season_year
 
+    try:
+        # Get cumulative stats for both teams (precomputed by compute_cumulative_stats)
+        away_stats = cumulative_stats.get((away_id, season_year, game_date))
+        home_stats = cumulative_stats.get((home_id, season_year, game_date))
+
+        # Fill row
+        data["game_id"][i] = event_id
+        data["game_date"][i] = game_date
+        data["season"][i] = season_year
+        data["away_team"][i] = game_info.away_name
+        data["away_team_id"][i] = away_id
+        data["home_team"][i] = game_info.home_name
+        data["home_team_id"][i] = home_id
+
+        # Add cumulative stats by position (lists are ordered like STAT_NAMES)
+        if away_stats is not None:
+            for col, stat_value in zip(AWAY_STAT_COLUMNS, away_stats):
+                data[col][i] = stat_value
+        if home_stats is not None:
+            for col, stat_value in zip(HOME_STAT_COLUMNS, home_stats):
+                data[col][i] = stat_value
+
+        return True
+    except Exception as e:
+        print(f"Error building game row for {event_id}: {e}")
+        return False
 
-async def fetch_game_stats(session: aiohttp.ClientSession, game_info: Dict,
-                           schedules_cache: Dict, stats_cache: Dict,
-                           fetch_market: bool = True) -> Dict:
-    """Fetch all stats for a single game including cumulative team stats and Polymarket data."""
 
-    event_id = game_info["game_id"]
-    game_date = game_info["date"]
-    away_id = game_info["away_id"]
-    home_id = game_info["home_id"]
-    season_year = game_info["season_year"]
+async def fetch_game_market_data(session: aiohttp.ClientSession, game_info: ScheduledGame,
+                                 data: Dict[str, list], i: int) -> None:
+    """Fetch a game's Polymarket opening price and write it into row i of the market columns."""
+    away_poly = _POLY_BY_ID.get(game_info.away_id)
+    home_poly = _POLY_BY_ID.get(game_info.home_id)
+    if not (away_poly and home_poly):
+        return
 
     try:
-        # Get cumulative stats for both teams from cache
-        away_stats = get_team_cumulative_stats(away_id, season_year, game_date, schedules_cache, stats_cache)
-        home_stats = get_team_cumulative_stats(home_id, season_year, game_date, schedules_cache, stats_cache)
-
-        # Build row
-        row = {
-            "game_id": event_id,
-            "game_date": game_date,
-            "season": season_year,
-            "away_team": game_info["away_name"],
-            "away_team_id": away_id,
-            "home_team": game_info["home_name"],
-            "home_team_id": home_id
-        }
-
-        # Add cumulative stats with prefixes
-        for stat_name, stat_value in away_stats.items():
-            row[f"away_{stat_name}"] = stat_value
-        for stat_name, stat_value in home_stats.items():
-            row[f"home_{stat_name}"] = stat_value
-
-        # Fetch Polymarket data if requested
-        if fetch_market:
-            away_poly = TEAM_ID_MAP.get(away_id, (None, None, None))[2]
-            home_poly = TEAM_ID_MAP.get(home_id, (None, None, None))[2]
-
-            if away_poly and home_poly:
-                market_data = await polyapi.get_opening_price(
-                    session,
-                    sport="nba",
-                    date=game_date,
-                    away_team=away_poly,
-                    home_team=home_poly
-                )
-
-                row["polymarket_away_price"] = market_data.get("away_price")
-                row["polymarket_home_price"] = market_data.get("home_price")
-                row["polymarket_start_ts"] = market_data.get("start_ts")
-                row["polymarket_market_open_ts"] = market_data.get("market_open_ts")
-                row["polymarket_market_close_ts"] = market_data.get("market_close_ts")
-
-        return row
+        market_data = await polyapi.get_opening_price_cached(
+            session,
+            sport="nba",
+            date=game_info.date,
+            away_team=away_poly,
+            home_team=home_poly
+        )
     except Exception as e:
-        print(f"Error fetching game stats for {event_id}: {e}")
-        return {}
+        print(f"Error fetching market data for {game_info.game_id}: {e}")
+        return
+
+    data["polymarket_away_price"][i] = market_data.get("away_price")
+    data["polymarket_home_price"][i] = market_data.get("home_price")
+    data["polymarket_start_ts"][i] = market_data.get("start_ts")
+    data["polymarket_market_open_ts"][i] = market_data.get("market_open_ts")
+    data["polymarket_market_close_ts"][i] = market_data.get("market_close_ts")
+
 
+async def fetch_all_game_stats(session: aiohttp.ClientSession, games: List[ScheduledGame],
+                               team_matrices: Dict,
+                               max_concurrent: int, fetch_market_data: bool) -> pd.DataFrame:
+    """Build rows for all games, then fetch their market data with concurrency control.
 
-async def fetch_all_game_stats(session: aiohttp.ClientSession, games: List[Dict],
-                               schedules_cache: Dict, stats_cache: Dict,
-                               max_concurrent: int, fetch_market_data: bool) -> List[Dict]:
-    """Fetch stats for all games with concurrency control."""
+    Each game writes straight into preallocated column lists (one slot per game)
+    rather than building a dict per row. Team stats need no network, so all rows are
+    filled first and the Polymarket lookups then run as one bounded fan-out.
+    """
+    columns = GAME_COLUMNS + STAT_COLUMNS + (MARKET_COLUMNS if fetch_market_data else [])
     if not games:
-        return []
+        return pd.DataFrame(columns=columns)
+
+    data = {col: [None] * len(games) for col in columns}
+
+    # All cumulative stat lookups for these games in one vectorized pass
+    cumulative_stats = compute_cumulative_stats(games, team_matrices)
 
-    semaphore = asyncio.Semaphore(max_concurrent)
+    # Pass 1: team stats (CPU only); failed rows are dropped
+    ok = [i for i, game in enumerate(games) if write_game_row(game, cumulative_stats, data, i)]
 
-    async def fetch_with_limit(game):
-        async with semaphore:
-            return await fetch_game_stats(session, game, schedules_cache, stats_cache, fetch_market_data)
+    # Pass 2: Polymarket opening prices
+    if fetch_market_data:
+        semaphore = asyncio.Semaphore(max_concurrent)
+        market_progress = tqdm(total=len(ok), desc="Fetching markets", mininterval=PROGRESS_INTERVAL)
 
-    tasks = [fetch_with_limit(game) for game in games]
-    results = await tqdm_asyncio.gather(*tasks, desc="Fetching games")
+        async def fetch_with_limit(i):
+            async with semaphore:
+                await fetch_game_market_data(session, games[i], data, i)
+            market_progress.update(1)
 
-    # Filter out failures
-    rows = []
-    for i, result in enumerate(results):
-        if isinstance(result, dict) and result:
-            rows.append(result)
-        elif isinstance(result, Exception):
-            print(f"Error fetching game {games[i]['game_id']}: {result}")
+        try:
+            await asyncio.gather(*[fetch_with_limit(i) for i in ok])
+        finally:
+            market_progress.close()
 
-    return rows
+    return pd.DataFrame({
+        col: np.asarray([values[i] for i in ok], dtype=COLUMN_DTYPES.get(col, object))
+        for col, values in data.items()
+    })
 
 
 async def get_historical_data(start_season: int, end_season: int,
                               max_concurrent: int = 5,
-                              fetch_market_data: bool = True) -> pd.DataFrame:
+                              fetch_market_data: bool = True,
+                              session: Optional[aiohttp.ClientSession] = None) -> pd.DataFrame:
     """Fetch historical NBA game data with team stats and optionally market data.
 
     Args:
@@ -338,51 +406,79 @@ async def get_historical_data(start_season: int, end_season: int,
         end_season: Ending season year (e.g., 2025 for 2024-2025 season)
         max_concurrent: Maximum number of concurrent requests
         fetch_market_data: Whether to fetch Polymarket market data
+        session: Existing session to reuse (left open); a new one is created if omitted
 
     Returns:
         DataFrame with game data, cumulative per-game team stats, and market data.
         Excludes games from the first 2 calendar weeks of each season.
     """
 
-    # Create session for all requests
-    async with aiohttp.ClientSession() as session:
+    # One keep-alive session for all requests, pooled for the stats fan-out
+    session_context = contextlib.nullcontext(session) if session is not None else create_session(limit_per_host=max_concurrent * 4)
+    async with session_context as session:
         # Collect all seasons to fetch (inclusive range)
         seasons_to_fetch = list(range(start_season, end_season + 1))
 
         print(f"Fetching data for seasons: {seasons_to_fetch}")
 
-        # Fetch schedules for all teams across all seasons
-        all_schedule_tasks = []
-        for season in seasons_to_fetch:
-            for team_id in range(1, 31):  # NBA has 30 teams (IDs 1-30)
-                all_schedule_tasks.append(fetch_schedule_for_team(session, team_id, season))
-
-        print(f"Fetching schedules for {len(all_schedule_tasks)} team-seasons...")
-        all_schedules = await asyncio.gather(*all_schedule_tasks)
-
-        # Flatten all games and remove duplicates
-        all_games_dict = {}  # Use dict to deduplicate by game_id
+        # Scoreboards and box score stats run as one pipeline under a shared semaphore:
+        # each game's stats fetch starts as soon as its month's scoreboard arrives,
+        # instead of waiting for all scoreboards to finish first
+        semaphore = asyncio.Semaphore(max_concurrent)
+        all_games_dict = {}  # game_id -> ScheduledGame (scoreboard games are already unique)
+        stats_cache = {}  # (game_id, team_id) -> stats_dict
+        stats_progress = tqdm(total=0, desc="Fetching stats", mininterval=PROGRESS_INTERVAL)
+
+        async def fetch_stats_with_limit(game_id):
+            async with semaphore:
+                event_stats = await fetch_game_team_stats(session, game_id)
+            for team_id, stats in event_stats.items():
+                if stats:  # Only cache non-empty stats
+                    stats_cache[(game_id, team_id)] = stats
+            stats_progress.update(1)
+
+        async def fetch_scoreboard_with_limit(task_group, start_date, end_date, season):
+            async with semaphore:
+                games = await fetch_scoreboard_games(session, start_date, end_date, season)
+
+            new_games = [game for game in games if game.game_id not in all_games_dict]
+            stats_progress.total += len(new_games)
+            stats_progress.refresh()
+            for game in new_games:
+                all_games_dict[game.game_id] = game
+                task_group.create_task(fetch_stats_with_limit(game.game_id))
+
+        scoreboard_ranges = [(month, season) for season in seasons_to_fetch for month in _season_months(season)]
+        print(f"Fetching scoreboards and stats for {len(scoreboard_ranges)} season-months...")
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for (start_date, end_date), season in scoreboard_ranges:
+                    task_group.create_task(fetch_scoreboard_with_limit(task_group, start_date, end_date, season))
+        finally:
+            stats_progress.close()
+
+        # Per-team schedules (date-sorted) derived from the unique games
+        schedules_cache = {}  # (team_id, season) -> [games]
         season_start_dates = {}  # Track first game date for each season
 
-        for games in all_schedules:
-            for game in games:
-                game_id = game["game_id"]
-                season = game["season_year"]
+        # Date order also drives the market fan-out below: gather starts tasks in list
+        # order and the semaphore is FIFO, so same-day Polymarket lookups go out together
+        games_by_date = sorted(all_games_dict.values(), key=lambda game: game.date)
+        for game in games_by_date:
+            season = game.season_year
+            schedules_cache.setdefault((game.away_id, season), []).append(game)
+            schedules_cache.setdefault((game.home_id, season), []).append(game)
 
-                # Track season start dates
-                if season not in season_start_dates:
-                    season_start_dates[season] = game["date"]
-                else:
-                    season_start_dates[season] = min(season_start_dates[season], game["date"])
+            # Games are visited in date order, so the first one seen starts the season
+            season_start_dates.setdefault(season, game.date)
 
-                # Add game (deduplicates automatically)
-                if game_id not in all_games_dict:
-                    all_games_dict[game_id] = game
+        print(f"Schedules cache built: {len(schedules_cache)} team-seasons")
+        print(f"Stats cache built: {len(stats_cache)} entries")
 
         # Filter out games from first 2 calendar weeks of each season
         filtered_games = []
-        for game in all_games_dict.values():
-            season = game["season_year"]
+        for game in games_by_date:
+            season = game.season_year
             season_start = season_start_dates.get(season)
 
             if season_start:
@@ -390,7 +486,7 @@ async def get_historical_data(start_season: int, end_season: int,
                 cutoff_date = season_start + timedelta(days=14)
 
                 # Only include games after the first 2 weeks
-                if game["date"] >= cutoff_date:
+                if game.date >= cutoff_date:
                     filtered_games.append(game)
 
         print(f"Found {len(all_games_dict)} total games")
@@ -399,76 +495,29 @@ async def get_historical_data(start_season: int, end_season: int,
         if not filtered_games:
             return pd.DataFrame()
 
-        # Build schedules cache from already-fetched schedules
-        print("Building schedules cache...")
-        schedules_cache = {}
-        for i, games in enumerate(all_schedules):
-            if games:
-                # Determine team_id and season from first game in schedule
-                first_game = games[0]
-                season = first_game["season_year"]
-
-                # Determine which team this schedule belongs to
-                # Since we fetched in order (team_id 1-30), we can calculate
-                team_id = (i % 30) + 1  # Team IDs are 1-30
-
-                cache_key = (team_id, season)
-                schedules_cache[cache_key] = games
-
-        print(f"Schedules cache built: {len(schedules_cache)} team-seasons")
-
-        # Build stats cache by pre-fetching all game stats
-        print("Pre-fetching game stats for all unique games...")
-
-        # Collect all unique (game_id, team_id) pairs needed
-        games_to_fetch = set()
-        for game in all_games_dict.values():
-            game_id = game["game_id"]
-            away_id = game["away_id"]
-            home_id = game["home_id"]
-            games_to_fetch.add((game_id, away_id))
-            games_to_fetch.add((game_id, home_id))
-
-        print(f"Fetching stats for {len(games_to_fetch)} game-team combinations...")
-
-        # Batch fetch all game stats with concurrency control
-        stats_semaphore = asyncio.Semaphore(max_concurrent)
-
-        async def fetch_stat_with_limit(game_id, team_id):
-            async with stats_semaphore:
-                stats = await fetch_team_game_stats(session, game_id, team_id)
-                return ((game_id, team_id), stats)
-
-        stat_tasks = [fetch_stat_with_limit(gid, tid) for gid, tid in games_to_fetch]
-        stat_results = await tqdm_asyncio.gather(*stat_tasks, desc="Fetching stats")
-
-        # Build stats cache
-        stats_cache = {}
-        for key, stats in stat_results:
-            if stats:  # Only cache non-empty stats
-                stats_cache[key] = stats
-
-        print(f"Stats cache built: {len(stats_cache)} entries")
+        team_matrices = build_team_stat_matrices(schedules_cache, stats_cache)
 
         # Fetch stats for all games using caches
-        rows = await fetch_all_game_stats(session, filtered_games, schedules_cache, stats_cache,
+        df = await fetch_all_game_stats(session, filtered_games, team_matrices,
                                          max_concurrent, fetch_market_data)
 
-    # Return as DataFrame
-    return pd.DataFrame(rows).dropna()
+    # Only the float columns can be missing (game info is always filled for kept rows),
+    # so restrict the NaN scan to them instead of every object column
+    nullable_columns = [col for col in STAT_COLUMNS + MARKET_COLUMNS if col in df.columns]
+    return df.dropna(subset=nullable_columns)
 
 
 def get_historical_data_sync(start_season: int, end_season: int,
                              fetch_market_data: bool = True) -> pd.DataFrame:
-    """Synchronous wrapper for the async function.
+    """Synchronous wrapper for the async function (shares one loop and session across calls).
 
     Args:
         start_season: Starting season year (e.g., 2024 for 2023-2024 season)
         end_season: Ending season year (e.g., 2025 for 2024-2025 season)
         fetch_market_data: Whether to fetch Polymarket market data
     """
-    return asyncio.run(get_historical_data(start_season, end_season,
-                                          fetch_market_data=fetch_market_data))
+    return run_with_shared_session(get_historical_data, start_season, end_season,
+                                   fetch_market_data=fetch_market_data)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,127 @@
+"""Helpers shared by the ESPN-backed clients (football_api and basketball_api)."""
+import aiohttp
+import asyncio
+import logging
+from datetime import date, datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+from typing import Dict, Optional
+
+from .http_client import get_json, read_cache, single_flight, write_cache
+
+logger = logging.getLogger(__name__)
+
+# Game dates are US Eastern calendar dates
+ET = ZoneInfo("America/New_York")
+
+# Schedules for the season in progress can still change; finished seasons never do
+ACTIVE_SEASON_SCHEDULE_TTL = 3600
+FINISHED_SEASON_SCHEDULE_TTL = 365 * 24 * 3600
+
+# Box score stats of a completed game are final, so they're kept on disk indefinitely
+COMPLETED_EVENT_STATS_TTL = 365 * 24 * 3600
+
+# Progress bars are updated manually by each task; redraw at most this often (seconds)
+PROGRESS_INTERVAL = 0.5
+
+# Polymarket columns of the historical data frames. Each client's COLUMN_DTYPES makes
+# them float64, because missing markets are NaN (those rows are dropped at the end).
+MARKET_COLUMNS = [
+    "polymarket_away_price",
+    "polymarket_home_price",
+    "polymarket_start_ts",
+    "polymarket_market_open_ts",
+    "polymarket_market_close_ts"
+]
+
+# (league, event_id) -> task resolving to {team_id: stats_dict} for both teams in that game.
+# Both teams' stats come from the same summary response, so it is fetched once per game.
+_event_stats_cache: Dict[tuple, asyncio.Future] = {}
+
+
+def poly_abbreviations(team_id_map: Dict[int, tuple]) -> Dict[int, str]:
+    """ESPN team id -> Polymarket abbreviation from a TEAM_ID_MAP, built once instead of per game."""
+    return {team_id: info[2] for team_id, info in team_id_map.items()}
+
+
+@lru_cache(maxsize=None)
+def et_game_date(game_date_str: str) -> date:
+    """US Eastern calendar date of an ESPN UTC timestamp like "2024-09-08T17:00Z".
+
+    Many games share a start time, so the same strings are parsed repeatedly.
+    """
+    # 3.11+ fromisoformat parses the "Z" suffix natively
+    return datetime.fromisoformat(game_date_str).astimezone(ET).date()
+
+
+def schedule_ttl(season: int, current_season: int) -> int:
+    """On-disk cache TTL for schedule data of a season, given the season in progress."""
+    if season < current_season:
+        return FINISHED_SEASON_SCHEDULE_TTL
+    return ACTIVE_SEASON_SCHEDULE_TTL
+
+
+def coerce_float(value) -> Optional[float]:
+    """float(value), or None for missing / non-numeric values like "-", "--" or "N/A"."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+async def fetch_game_team_stats(session: aiohttp.ClientSession, league: str, event_id: str,
+                                allowed_stats: frozenset, value_key: str) -> Dict[int, Dict[str, float]]:
+    """Both teams' statistics for a game, shared across concurrent and repeated calls.
+
+    Args:
+        session: aiohttp session
+        league: ESPN sport/league path (e.g., "football/nfl")
+        event_id: ESPN event id
+        allowed_stats: Whitelist of statistic names to keep
+        value_key: Statistic field holding the number ("value" or "displayValue")
+    """
+    return await single_flight(_event_stats_cache, (league, event_id),
+                               lambda: fetch_event_team_stats(session, league, event_id, allowed_stats, value_key))
+
+
+async def fetch_event_team_stats(session: aiohttp.ClientSession, league: str, event_id: str,
+                                 allowed_stats: frozenset, value_key: str) -> Dict[int, Dict[str, float]]:
+    """Fetch statistics for both teams in a game. Returns dict of team_id: {stat_name: value}."""
+    url = f"https://site.api.espn.com/apis/site/v2/sports/{league}/summary?event={event_id}"
+    cache_key = f"{url}#team_stats"
+
+    # Parsed stats of completed games are cached on disk across runs (JSON keys are strings)
+    cached = await asyncio.to_thread(read_cache, cache_key, COMPLETED_EVENT_STATS_TTL)
+    if cached:
+        return {int(team_id): stats for team_id, stats in cached.items()}
+
+    try:
+        # Transient ESPN failures are retried so a single 503 doesn't drop a game's stats
+        data = await get_json(session, url) or {}
+
+        teams = data.get("boxscore", {}).get("teams", [])
+
+        event_stats = {}
+        for team_data in teams:
+            team_id = team_data.get("team", {}).get("id")
+            if not team_id:
+                continue
+
+            # Extract only whitelisted, numeric statistics
+            event_stats[int(team_id)] = {
+                stat["name"]: value
+                for stat in team_data.get("statistics", [])
+                if stat.get("name") in allowed_stats
+                and (value := coerce_float(stat.get(value_key))) is not None
+            }
+
+        # Only cache final box scores; in-progress games would freeze partial stats
+        competitions = data.get("header", {}).get("competitions", [{}])
+        completed = competitions[0].get("status", {}).get("type", {}).get("completed", False) if competitions else False
+        if completed and event_stats:
+            await asyncio.to_thread(write_cache, cache_key, {str(team_id): stats for team_id, stats in event_stats.items()})
+
+        return event_stats
+    except Exception as e:
+        logger.warning("Error fetching stats for event %s: %s", event_id, e)
+        return {}
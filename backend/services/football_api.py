@@ -1,12 +1,15 @@
 import aiohttp
 import asyncio
+import contextlib
 from datetime import datetime
-from zoneinfo import ZoneInfo
 import pandas as pd
 from typing import List, Dict, Optional
-from tqdm.asyncio import tqdm_asyncio
+from tqdm import tqdm
 
+from . import espn
 from . import polymarket_api as polyapi
+from .espn import ET, MARKET_COLUMNS, PROGRESS_INTERVAL
+from .http_client import create_session, get_json_cached, run_with_shared_session, single_flight
 
 # NFL team ID: (Full Name, [Unused - was Kalshi], Polymarket Abbreviation)
 TEAM_ID_MAP = {
@@ -44,14 +47,31 @@ TEAM_ID_MAP = {
     34: ("Houston Texans", "HOU", "hou"),
 }
 
+_POLY_BY_ID: Dict[int, str] = espn.poly_abbreviations(TEAM_ID_MAP)
+
+
+def _schedule_ttl(year: int) -> int:
+    # An NFL season (year = season start) runs Sept-Feb, so it's over by March of year + 1
+    today = datetime.now(ET).date()
+    return espn.schedule_ttl(year, today.year if today.month >= 3 else today.year - 1)
+
+
+# (year, week) -> task resolving to that week's games, so callers asking for the same week
+# share one fetch and parse. Cleared when a get_historical_data run starts, since
+# active-season schedules change; the raw responses also sit in the on-disk HTTP cache.
+_schedule_cache: Dict[tuple, asyncio.Future] = {}
+
 
 async def fetch_schedule(session: aiohttp.ClientSession, year: int, week: int) -> List[Dict]:
     """Fetch schedule for a specific year/week. Returns list of game dicts."""
+    return await single_flight(_schedule_cache, (year, week), lambda: _fetch_schedule_uncached(session, year, week))
+
+
+async def _fetch_schedule_uncached(session: aiohttp.ClientSession, year: int, week: int) -> List[Dict]:
     url = f"https://cdn.espn.com/core/nfl/schedule?xhr=1&year={year}&week={week}"
 
     try:
-        async with session.get(url) as response:
-            data = await response.json()
+        data = await get_json_cached(session, url, _schedule_ttl(year)) or {}
 
         schedule_data = data.get("content", {}).get("schedule", {})
         games = []
@@ -70,21 +90,17 @@ async def fetch_schedule(session: aiohttp.ClientSession, year: int, week: int) -
                 if not event_id:
                     continue
 
-                # Extract team info
-                competitors = competition["competitors"]
-                home_team = next((c for c in competitors if c.get("homeAway") == "home"), None)
-                away_team = next((c for c in competitors if c.get("homeAway") == "away"), None)
+                # Extract team info, indexing competitors by side in one pass
+                sides = {c.get("homeAway"): c for c in competition["competitors"]}
+                home_team = sides.get("home")
+                away_team = sides.get("away")
 
                 if not home_team or not away_team:
                     continue
 
                 try:
-                    game_date_str = game.get("date")
-                    # Parse as UTC datetime
-                    game_datetime_utc = datetime.fromisoformat(game_date_str.replace("Z", "+00:00"))
-                    # Convert to US Eastern time to get the correct local game date
-                    game_datetime_et = game_datetime_utc.astimezone(ZoneInfo("America/New_York"))
-                    game_date = game_datetime_et.date()
+                    # Convert the UTC kickoff to US Eastern time to get the correct local game date
+                    game_date = espn.et_game_date(game.get("date"))
 
                     games.append({
                         "game_id": event_id,
@@ -106,215 +122,206 @@ async def fetch_schedule(session: aiohttp.ClientSession, year: int, week: int) -
         return []
 
 
-async def fetch_team_game_stats(session: aiohttp.ClientSession, event_id: str, team_id: int) -> Dict[str, float]:
-    """Fetch team statistics for a specific game. Returns dict of stat_name: value."""
-    url = f"https://site.api.espn.com/apis/site/v2/sports/football/nfl/summary?event={event_id}"
-
-    # Whitelist of statistics to keep
-    ALLOWED_STATS = {
-        # Efficiency metrics (good for similarity)
-        "thirdDownEff",
-        "fourthDownEff",
-        "yardsPerPlay",
-        "yardsPerPass",
-        "yardsPerRushAttempt",
-        "redZoneAttempts",
-        # Volume metrics (kept for normalization)
-        "firstDowns",
-        "netPassingYards",
-        "rushingYards",
-        "interceptions",
-        "fumblesLost"
-    }
+# Whitelist of statistics to keep
+ALLOWED_STATS = frozenset({
+    # Efficiency metrics (good for similarity)
+    "thirdDownEff",
+    "fourthDownEff",
+    "yardsPerPlay",
+    "yardsPerPass",
+    "yardsPerRushAttempt",
+    "redZoneAttempts",
+    # Volume metrics (kept for normalization)
+    "firstDowns",
+    "netPassingYards",
+    "rushingYards",
+    "interceptions",
+    "fumblesLost"
+})
+
+# Fixed column order for the cumulative stats frame
+STAT_NAMES = sorted(ALLOWED_STATS)
+
+# Output schema (db.prepare_nfl_df_for_db adds sport and season)
+GAME_COLUMNS = ["game_id", "game_date", "week", "year", "away_team", "away_team_id", "home_team", "home_team_id"]
+STAT_COLUMNS = [f"{side}_{stat_name}" for side in ("away", "home") for stat_name in STAT_NAMES]
+
+# Explicit dtypes so pandas skips inference (see espn.MARKET_COLUMNS for the market columns)
+COLUMN_DTYPES = {
+    "week": "int64",
+    "year": "int64",
+    "away_team_id": "int64",
+    "home_team_id": "int64",
+    **{col: "float64" for col in STAT_COLUMNS + MARKET_COLUMNS}
+}
 
-    try:
-        async with session.get(url) as response:
-            data = await response.json()
-
-        teams = data.get("boxscore", {}).get("teams", [])
-
-        # Find the team by ID
-        team_data = None
-        for team in teams:
-            if team.get("team", {}).get("id") == str(team_id):
-                team_data = team
-                break
-
-        if not team_data:
-            return {}
-
-        # Extract only whitelisted statistics
-        statistics = team_data.get("statistics", [])
-        stats_dict = {}
-
-        for stat in statistics:
-            stat_name = stat.get("name")
-            stat_value = stat.get("value")
-
-            # Only process whitelisted stats
-            if stat_name in ALLOWED_STATS and stat_value is not None:
-                # Try to convert to float, skip if it's a string like "-" or "N/A"
-                if isinstance(stat_value, (int, float)):
-                    stats_dict[stat_name] = float(stat_value)
-                elif isinstance(stat_value, str) and stat_value not in ["-", "N/A", ""]:
-                    try:
-                        stats_dict[stat_name] = float(stat_value)
-                    except ValueError:
-                        # Skip non-numeric values
-                        pass
-
-        return stats_dict
-    except Exception as e:
-        print(f"Error fetching stats for event {event_id}, team {team_id}: {e}")
-        return {}
 
+async def fetch_game_team_stats(session: aiohttp.ClientSession, event_id: str) -> Dict[int, Dict[str, float]]:
+    """Both teams' statistics for a game, shared across concurrent and repeated calls."""
+    return await espn.fetch_game_team_stats(session, "football/nfl", event_id, ALLOWED_STATS, "value")
 
-async def get_team_cumulative_stats(session: aiohttp.ClientSession, team_id: int,
-                                    year: int, week: int) -> Dict[str, Optional[float]]:
-    """Calculate cumulative per-game stats for a team up to (not including) a specific game.
-    Includes data from weeks 1-3 in calculations, but only for games in week 4+."""
 
-    # Fetch all games for this team from weeks 1 through (week-1)
-    # This includes weeks 1-3 data for calculating week 4+ stats
-    all_previous_games = []
+async def precompute_cumulative_stats(session: aiohttp.ClientSession, schedules: List[List[Dict]],
+                                      games: List[Dict], max_concurrent: int) -> Dict:
+    """Cumulative per-game stats for every (team, year, week) the given games need, in one pass.
 
-    for prev_week in range(1, week):
-        games = await fetch_schedule(session, year, prev_week)
+    Fetches each earlier game's box score once (instead of once per later game of
+    either team), takes running per-team-season sums with a pandas groupby cumsum,
+    and reads each (team, week) off the last row from an earlier week via merge_asof.
 
-        # Find games involving this team
-        for game in games:
-            if game["away_id"] == team_id or game["home_id"] == team_id:
-                all_previous_games.append(game)
+    Args:
+        session: aiohttp session
+        schedules: fetch_schedule() results covering week 1 onwards of every season in games
+        games: Games to build rows for
+        max_concurrent: Maximum number of concurrent box score requests
 
-    if not all_previous_games:
-        # No previous games found, return empty stats
-        return {}
+    Returns:
+        Dict {(team_id, year, week): stats_dict} of per-game averages over the team's games
+        from earlier weeks of that season ({} if it has none)
+    """
+    last_week = {}
+    for game in games:
+        last_week[game["year"]] = max(last_week.get(game["year"], 0), game["week"])
 
-    # Fetch stats for all previous games
-    stat_totals = {}
-    games_with_stats = 0
+    # Only weeks before the last requested week of a season feed any average
+    history = sorted(
+        (game for schedule in schedules for game in schedule
+         if game["week"] < last_week.get(game["year"], 0)),
+        key=lambda game: (game["year"], game["week"])
+    )
 
-    for game in all_previous_games:
-        game_stats = await fetch_team_game_stats(session, game["game_id"], team_id)
+    semaphore = asyncio.Semaphore(max_concurrent)
 
-        if game_stats:
-            games_with_stats += 1
-            for stat_name, stat_value in game_stats.items():
-                if stat_name not in stat_totals:
-                    stat_totals[stat_name] = 0.0
-                stat_totals[stat_name] += stat_value
+    async def fetch_with_limit(game):
+        async with semaphore:
+            return await fetch_game_team_stats(session, game["game_id"])
+
+    history_stats = await asyncio.gather(*[fetch_with_limit(game) for game in history])
+
+    needed = sorted({(team_id, game["year"], game["week"])
+                     for game in games for team_id in (game["away_id"], game["home_id"])})
+
+    # One long-form row per team per game that has stats (history is already week-sorted)
+    long_rows = [
+        {"team_id": team_id, "year": game["year"], "week": game["week"], **team_stats}
+        for game, event_stats in zip(history, history_stats)
+        for team_id, team_stats in event_stats.items()
+        if team_stats
+    ]
+    if not long_rows:
+        return {key: {} for key in needed}
+
+    long_df = pd.DataFrame(long_rows)
+    values = long_df.reindex(columns=STAT_NAMES)
+    by_team = [long_df["team_id"], long_df["year"]]
+
+    # Running totals per team-season; missing stats add 0 but aren't counted as seen
+    running = long_df[["team_id", "year", "week"]].assign(
+        n_games=long_df.groupby(by_team).cumcount() + 1,
+        **values.fillna(0.0).groupby(by_team).cumsum(),
+        **values.notna().groupby(by_team).cumsum().add_prefix("seen_")
+    ).sort_values("week", kind="stable")
+
+    # For each (team, year, week): the running totals after its last game from an earlier week
+    needed_df = pd.DataFrame(needed, columns=["team_id", "year", "week"]).sort_values("week", kind="stable")
+    merged = pd.merge_asof(needed_df, running, on="week", by=["team_id", "year"],
+                           allow_exact_matches=False)
+
+    averages = merged[STAT_NAMES].div(merged["n_games"], axis=0)
+    averages = averages.where(merged[[f"seen_{stat_name}" for stat_name in STAT_NAMES]].to_numpy() > 0)
+
+    cumulative = {}
+    for key, n_games, row in zip(merged[["team_id", "year", "week"]].itertuples(index=False, name=None),
+                                 merged["n_games"].tolist(), averages.to_dict("records")):
+        cumulative[key] = {
+            stat_name: average for stat_name, average in row.items() if pd.notna(average)
+        } if n_games > 0 else {}
+
+    return cumulative
+
+
+def build_game_row(game_info: Dict, cumulative_stats: Dict, market_data: Optional[Dict]) -> Dict:
+    """Build a single game's row from its info, precomputed team stats and market data."""
+    away_id = game_info["away_id"]
+    home_id = game_info["home_id"]
+    week = game_info["week"]
+    year = game_info["year"]
 
-    if games_with_stats == 0:
-        return {}
+    # Get cumulative stats for both teams (precomputed by precompute_cumulative_stats)
+    away_stats = cumulative_stats.get((away_id, year, week), {})
+    home_stats = cumulative_stats.get((home_id, year, week), {})
+
+    # Build row
+    row = {
+        "game_id": game_info["game_id"],
+        "game_date": game_info["date"],
+        "week": week,
+        "year": year,
+        "away_team": game_info["away_name"],
+        "away_team_id": away_id,
+        "home_team": game_info["home_name"],
+        "home_team_id": home_id
+    }
 
-    # Calculate per-game averages
-    per_game_stats = {}
-    for stat_name, total in stat_totals.items():
-        per_game_stats[stat_name] = total / games_with_stats
+    # Add cumulative stats with prefixes
+    for stat_name, stat_value in away_stats.items():
+        row[f"away_{stat_name}"] = stat_value
+    for stat_name, stat_value in home_stats.items():
+        row[f"home_{stat_name}"] = stat_value
 
-    return per_game_stats
+    if market_data is not None:
+        row["polymarket_away_price"] = market_data.get("away_price")
+        row["polymarket_home_price"] = market_data.get("home_price")
+        row["polymarket_start_ts"] = market_data.get("start_ts")
+        row["polymarket_market_open_ts"] = market_data.get("market_open_ts")
+        row["polymarket_market_close_ts"] = market_data.get("market_close_ts")
 
+    return row
 
-async def fetch_game_stats(session: aiohttp.ClientSession, game_info: Dict, fetch_market: bool = True) -> Dict:
-    """Fetch all stats for a single game including cumulative team stats and Polymarket data."""
 
-    event_id = game_info["game_id"]
-    game_date = game_info["date"]
-    away_id = game_info["away_id"]
-    home_id = game_info["home_id"]
-    week = game_info["week"]
-    year = game_info["year"]
+async def fetch_game_market_data(session: aiohttp.ClientSession, game_info: Dict) -> Dict:
+    """Fetch a game's Polymarket opening price. Returns {} if unavailable."""
+    away_poly = _POLY_BY_ID.get(game_info["away_id"])
+    home_poly = _POLY_BY_ID.get(game_info["home_id"])
+    if not (away_poly and home_poly):
+        return {}
 
     try:
-        # Fetch cumulative stats for both teams
-        away_stats, home_stats = await asyncio.gather(
-            get_team_cumulative_stats(session, away_id, year, week),
-            get_team_cumulative_stats(session, home_id, year, week),
-            return_exceptions=True
+        return await polyapi.get_opening_price_cached(
+            session,
+            sport="nfl",
+            date=game_info["date"],
+            away_team=away_poly,
+            home_team=home_poly
         )
-
-        # Handle exceptions
-        if isinstance(away_stats, Exception):
-            print(f"Error fetching away stats for game {event_id}: {away_stats}")
-            away_stats = {}
-        if isinstance(home_stats, Exception):
-            print(f"Error fetching home stats for game {event_id}: {home_stats}")
-            home_stats = {}
-
-        # Build row
-        row = {
-            "game_id": event_id,
-            "game_date": game_date,
-            "week": week,
-            "year": year,
-            "away_team": game_info["away_name"],
-            "away_team_id": away_id,
-            "home_team": game_info["home_name"],
-            "home_team_id": home_id
-        }
-
-        # Add cumulative stats with prefixes
-        for stat_name, stat_value in away_stats.items():
-            row[f"away_{stat_name}"] = stat_value
-        for stat_name, stat_value in home_stats.items():
-            row[f"home_{stat_name}"] = stat_value
-
-        # Fetch Polymarket data if requested
-        if fetch_market:
-            away_poly = TEAM_ID_MAP.get(away_id, (None, None, None))[2]
-            home_poly = TEAM_ID_MAP.get(home_id, (None, None, None))[2]
-
-            if away_poly and home_poly:
-                market_data = await polyapi.get_opening_price(
-                    session,
-                    sport="nfl",
-                    date=game_date,
-                    away_team=away_poly,
-                    home_team=home_poly
-                )
-
-                row["polymarket_away_price"] = market_data.get("away_price")
-                row["polymarket_home_price"] = market_data.get("home_price")
-                row["polymarket_start_ts"] = market_data.get("start_ts")
-                row["polymarket_market_open_ts"] = market_data.get("market_open_ts")
-                row["polymarket_market_close_ts"] = market_data.get("market_close_ts")
-
-        return row
     except Exception as e:
-        print(f"Error fetching game stats for {event_id}: {e}")
+        print(f"Error fetching market data for {game_info['game_id']}: {e}")
         return {}
 
 
-async def fetch_all_game_stats(session: aiohttp.ClientSession, games: List[Dict],
-                               max_concurrent: int, fetch_market_data: bool) -> List[Dict]:
-    """Fetch stats for all games with concurrency control."""
-    if not games:
-        return []
-
+async def fetch_all_market_data(session: aiohttp.ClientSession, games: List[Dict],
+                                max_concurrent: int) -> List[Dict]:
+    """Fetch Polymarket opening prices for all games with concurrency control."""
     semaphore = asyncio.Semaphore(max_concurrent)
+    market_progress = tqdm(total=len(games), desc="Fetching markets", mininterval=PROGRESS_INTERVAL)
 
     async def fetch_with_limit(game):
         async with semaphore:
-            return await fetch_game_stats(session, game, fetch_market_data)
-
-    tasks = [fetch_with_limit(game) for game in games]
-    results = await tqdm_asyncio.gather(*tasks, desc="Fetching games")
-
-    # Filter out failures
-    rows = []
-    for i, result in enumerate(results):
-        if isinstance(result, dict) and result:
-            rows.append(result)
-        elif isinstance(result, Exception):
-            print(f"Error fetching game {games[i]['game_id']}: {result}")
+            market_data = await fetch_game_market_data(session, game)
+        market_progress.update(1)
+        return market_data
 
-    return rows
+    try:
+        return await asyncio.gather(*[fetch_with_limit(game) for game in games])
+    finally:
+        market_progress.close()
 
 
 async def get_historical_data(start_week: int, start_year: int,
                               end_week: int, end_year: int,
                               max_concurrent: int = 5,
-                              fetch_market_data: bool = True) -> pd.DataFrame:
+                              fetch_market_data: bool = True,
+                              session: Optional[aiohttp.ClientSession] = None) -> pd.DataFrame:
     """Fetch historical NFL game data with team stats and optionally market data.
 
     Args:
@@ -324,76 +331,115 @@ async def get_historical_data(start_week: int, start_year: int,
         end_year: Ending year (e.g., 2024)
         max_concurrent: Maximum number of concurrent requests
         fetch_market_data: Whether to fetch Polymarket market data
+        session: Existing session to reuse (left open); a new one is created if omitted
 
     Returns:
         DataFrame with game data, cumulative per-game team stats, and market data.
         Only includes games from week 4 onwards.
     """
 
-    # Create session for all requests
-    async with aiohttp.ClientSession() as session:
-        # Collect all (year, week) pairs to fetch
-        # IMPORTANT: Always fetch from week 1 to calculate cumulative stats correctly
-        weeks_to_fetch = []
+    # Start from fresh schedules: entries left by an earlier run may predate schedule changes
+    _schedule_cache.clear()
+
+    # One keep-alive session for all requests so TCP/TLS handshakes are reused
+    session_context = contextlib.nullcontext(session) if session is not None else create_session(limit_per_host=max_concurrent * 4)
+    async with session_context as session:
+        # Collect all (year, week) pairs to fetch: every season from week 1 (needed for
+        # cumulative stats), all 18 regular-season weeks except in the final season
+        weeks_to_fetch = [
+            (year, week)
+            for year in range(start_year, end_year + 1)
+            for week in range(1, (end_week if year == end_year else 18) + 1)
+        ]
+
+        # Weeks whose games become rows: week 4+ within [start_year/start_week, end_year/end_week]
+        wanted_weeks = {
+            (year, week) for year, week in weeks_to_fetch
+            if week >= 4 and (start_year, start_week) <= (year, week) <= (end_year, end_week)
+        }
 
-        if start_year == end_year:
-            # Same season - fetch from week 1 through end_week
-            for week in range(1, end_week + 1):
-                weeks_to_fetch.append((start_year, week))
-        else:
-            # Span multiple seasons
-            # Fetch all weeks of start year (starting from week 1)
-            for week in range(1, 19):  # NFL regular season is usually 18 weeks
-                weeks_to_fetch.append((start_year, week))
-
-            # Fetch all intermediate years (full 18 weeks each)
-            for year in range(start_year + 1, end_year):
-                for week in range(1, 19):
-                    weeks_to_fetch.append((year, week))
-
-            # Fetch weeks 1 through end_week of end year
-            for week in range(1, end_week + 1):
-                weeks_to_fetch.append((end_year, week))
-
-        # Fetch schedules for all weeks
-        schedule_tasks = [fetch_schedule(session, year, week) for year, week in weeks_to_fetch]
-        all_schedules = await asyncio.gather(*schedule_tasks)
-
-        # Flatten all games and filter to only include games from start_week onwards and week >= 4
-        all_games = []
-        for games in all_schedules:
-            for game in games:
-                # Only include games from week 4+, and from start_week onwards
-                if game["week"] >= 4:
-                    # Check if game is within the requested range
-                    if start_year == end_year:
-                        if start_week <= game["week"] <= end_week:
-                            all_games.append(game)
-                    else:
-                        # Multi-season: include if in start year (>= start_week) or end year (<= end_week)
-                        if (game["year"] == start_year and game["week"] >= start_week) or \
-                        (start_year < game["year"] < end_year) or \
-                        (game["year"] == end_year and game["week"] <= end_week):
-                            all_games.append(game)
+        # Only box scores from before a season's last wanted week feed any cumulative stats
+        last_wanted_week = {}
+        for year, week in wanted_weeks:
+            last_wanted_week[year] = max(last_wanted_week.get(year, 0), week)
+
+        # Fetch schedules for all weeks, at most max_concurrent requests in flight. As soon as
+        # a week's schedule arrives its box scores start downloading, instead of waiting for
+        # every schedule; precompute_cumulative_stats then finds them in the per-event cache.
+        semaphore = asyncio.Semaphore(max_concurrent)
+
+        async def prefetch_box_score(event_id):
+            async with semaphore:
+                await fetch_game_team_stats(session, event_id)
+
+        async def fetch_week(task_group, year, week):
+            async with semaphore:
+                games = await fetch_schedule(session, year, week)
+            if week < last_wanted_week.get(year, 0):
+                for game in games:
+                    task_group.create_task(prefetch_box_score(game["game_id"]))
+            return games
+
+        async with asyncio.TaskGroup() as task_group:
+            schedule_tasks = [task_group.create_task(fetch_week(task_group, year, week))
+                              for year, week in weeks_to_fetch]
+        all_schedules = [task.result() for task in schedule_tasks]
+
+        # Flatten all games and keep only those in the wanted weeks
+        all_games = [
+            game for games in all_schedules for game in games
+            if (game["year"], game["week"]) in wanted_weeks
+        ]
 
         print(f"Found {len(all_games)} games to fetch (filtered to weeks {start_week}-{end_week}, week >= 4)")
 
+        if fetch_market_data:
+            # Without a Polymarket abbreviation for both teams there's no market, and the row
+            # would be dropped at the end anyway, so don't spend stats requests on it
+            eligible_games = [game for game in all_games
+                              if game["away_id"] in _POLY_BY_ID and game["home_id"] in _POLY_BY_ID]
+            if len(eligible_games) < len(all_games):
+                print(f"Skipping {len(all_games) - len(eligible_games)} games with teams missing from TEAM_ID_MAP")
+            all_games = eligible_games
+
         if not all_games:
             return pd.DataFrame()
 
-        # Fetch stats for all games
-        rows = await fetch_all_game_stats(session, all_games, max_concurrent, fetch_market_data)
+        # Every team's cumulative stats for the requested weeks, from one pass over the box scores.
+        # Polymarket lookups don't depend on them, so both fan-outs run at the same time.
+        stats_pass = precompute_cumulative_stats(session, all_schedules, all_games, max_concurrent)
+        if fetch_market_data:
+            cumulative_stats, market_data = await asyncio.gather(
+                stats_pass, fetch_all_market_data(session, all_games, max_concurrent)
+            )
+        else:
+            cumulative_stats, market_data = await stats_pass, [None] * len(all_games)
+
+        rows = [
+            build_game_row(game, cumulative_stats, game_market_data)
+            for game, game_market_data in zip(all_games, market_data)
+        ]
+
+    columns = GAME_COLUMNS + STAT_COLUMNS + (MARKET_COLUMNS if fetch_market_data else [])
+    df = pd.DataFrame.from_records(rows, columns=columns).astype(
+        {col: dtype for col, dtype in COLUMN_DTYPES.items() if col in columns}
+    )
+
+    # A stat ESPN never reported leaves an all-NaN column; drop it rather than every row
+    df = df.drop(columns=[col for col in STAT_COLUMNS if not df[col].notna().any()])
 
-    # Filter out games with missing Polymarket data (some games don't have markets)
-    return pd.DataFrame(rows).dropna()
+    # Filter out games with missing stats or Polymarket data (some games don't have markets).
+    # Game info is always filled, so only the float columns need the NaN scan.
+    nullable_columns = [col for col in STAT_COLUMNS + MARKET_COLUMNS if col in df.columns]
+    return df.dropna(subset=nullable_columns)
 
 
 def get_historical_data_sync(start_week: int, start_year: int,
                              end_week: int, end_year: int,
                              fetch_market_data: bool = True) -> pd.DataFrame:
-    """Synchronous wrapper for the async function."""
-    return asyncio.run(get_historical_data(start_week, start_year, end_week, end_year,
-                                          fetch_market_data=fetch_market_data))
+    """Synchronous wrapper for the async function (shares one loop and session across calls)."""
+    return run_with_shared_session(get_historical_data, start_week, start_year, end_week, end_year,
+                                   fetch_market_data=fetch_market_data)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,248 @@
+import asyncio
+import atexit
+import contextlib
+import hashlib
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable, MutableMapping
+
+import aiohttp
+import orjson
+
+try:
+    import uvloop
+except ImportError:  # uvloop doesn't support Windows
+    uvloop = None
+
+# Errors go through logging so scripts that queue their log records (discover_active_markets)
+# don't write to stdout from the event loop
+logger = logging.getLogger(__name__)
+
+# On-disk cache for slow-changing upstream responses (ESPN schedules etc.)
+CACHE_DIR = Path(__file__).resolve().parents[2] / ".cache" / "http"
+
+# Statuses worth retrying: rate limiting and transient upstream failures
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+# Long-lived event loop + session for the *_sync wrappers, so repeated calls in one
+# process (notebooks, scripts backfilling several ranges) keep their warm connections.
+# An aiohttp session is bound to its loop, hence the shared Runner rather than asyncio.run.
+_shared_runner: asyncio.Runner | None = None
+_shared_session: aiohttp.ClientSession | None = None
+_shared_session_loop: asyncio.AbstractEventLoop | None = None
+
+
+def run(main):
+    """asyncio.run(main) on a uvloop event loop when uvloop is available."""
+    if uvloop is not None:
+        return asyncio.run(main, loop_factory=uvloop.new_event_loop)
+    return asyncio.run(main)
+
+
+def run_with_shared_session(func, *args, **kwargs):
+    """
+    Run func(*args, session=<shared session>, **kwargs) to completion from sync code.
+
+    Uses one event loop (uvloop when available) and one keep-alive ClientSession for the
+    whole process; both are closed at interpreter exit.
+    """
+    global _shared_runner
+    if _shared_runner is None:
+        _shared_runner = asyncio.Runner(loop_factory=uvloop.new_event_loop if uvloop is not None else None)
+        atexit.register(_close_shared)
+
+    async def _main():
+        return await func(*args, session=await get_shared_session(), **kwargs)
+
+    return _shared_runner.run(_main())
+
+
+async def get_shared_session() -> aiohttp.ClientSession:
+    """
+    Process-wide keep-alive session (create_session defaults) for the running event loop.
+
+    Created on first use, and again if it was closed or belongs to an earlier loop, since
+    a session can't be used from a different loop.
+    """
+    global _shared_session, _shared_session_loop
+    loop = asyncio.get_running_loop()
+    if _shared_session is None or _shared_session.closed or _shared_session_loop is not loop:
+        _shared_session = create_session()
+        _shared_session_loop = loop
+    return _shared_session
+
+
+def _close_shared():
+    if _shared_session is not None and not _shared_session.closed:
+        _shared_runner.run(_shared_session.close())
+    _shared_runner.close()
+
+
+def create_session(limit: int = 100, limit_per_host: int = 32, total_timeout: int = 30,
+                   connect_timeout: int = 5) -> aiohttp.ClientSession:
+    """
+    Create a ClientSession with a keep-alive connector sized for concurrent fan-out.
+
+    connect_timeout bounds pool wait + TCP/TLS setup separately from the total, so a
+    stalled handshake fails fast instead of eating the whole request budget.
+    aiohttp advertises and decodes gzip itself, and br too when Brotli is installed.
+    Must be called from inside a running event loop.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=300,
+        # Cloudflare (Polymarket) and ESPN's CDN keep idle connections for ~60-100s, so
+        # holding ours that long saves a TCP+TLS handshake between bursts of requests
+        keepalive_timeout=75
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+    )
+
+
+async def single_flight(cache: MutableMapping, key, coro_factory: Callable[[], Awaitable],
+                        keep: Callable[[Any], bool] = bool):
+    """
+    Await coro_factory() through cache[key], so concurrent and repeated callers share one run.
+
+    The shared task is shielded, so one caller being cancelled doesn't cancel it for the
+    others. Once it finishes, the entry stays only if keep(result) is true; failures,
+    cancellations and rejected results are dropped so the next call runs it again
+    (keep=lambda _: False shares in-flight runs only). A finished entry can be read from
+    any event loop, but a pending one from an earlier asyncio.run() loop can't be awaited
+    here, so it's replaced by a fresh run.
+    """
+    task = cache.get(key)
+    if task is not None:
+        if task.done():
+            if not task.cancelled() and task.exception() is None and keep(task.result()):
+                return task.result()
+            task = None
+        elif task.get_loop() is not asyncio.get_running_loop():
+            task = None
+
+    if task is None:
+        task = asyncio.ensure_future(coro_factory())
+        cache[key] = task
+
+        def _drop_unkept(t):
+            if cache.get(key) is t and (t.cancelled() or t.exception() is not None or not keep(t.result())):
+                del cache[key]
+
+        task.add_done_callback(_drop_unkept)
+
+    return await asyncio.shield(task)
+
+
+@lru_cache(maxsize=4096)
+def parse_iso(timestamp: str) -> datetime:
+    """Timezone-aware datetime for an ISO timestamp with a "Z" or "+00:00" suffix.
+
+    Markets on the same slate share start/close times, so the same strings repeat.
+    """
+    return datetime.fromisoformat(timestamp)  # 3.11+ parses the "Z" suffix natively
+
+
+async def read_json(response: aiohttp.ClientResponse):
+    """Decode a response body with orjson (faster than aiohttp's stdlib-json .json())."""
+    return orjson.loads(await response.read())
+
+
+async def get_json(session: aiohttp.ClientSession, url: str, attempts: int = 4,
+                   initial_backoff: float = 0.5, max_backoff: float = 8.0, **kwargs):
+    """
+    GET url and return parsed JSON, retrying transient failures.
+
+    Connection errors, timeouts and RETRY_STATUSES responses are retried with jittered
+    exponential backoff; the last error is raised once attempts are exhausted. Any other
+    non-200 status (e.g. 404) returns None without retrying.
+    """
+    for attempt in range(attempts):
+        try:
+            async with session.get(url, **kwargs) as response:
+                if response.status == 200:
+                    return await read_json(response)
+                if response.status not in RETRY_STATUSES:
+                    return None
+                error = aiohttp.ClientResponseError(
+                    response.request_info, response.history,
+                    status=response.status, message=response.reason or ""
+                )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = e
+
+        if attempt == attempts - 1:
+            raise error
+        await asyncio.sleep(backoff_delay(attempt, initial_backoff, max_backoff))
+
+
+def backoff_delay(attempt: int, initial_backoff: float = 0.5, max_backoff: float = 8.0) -> float:
+    """Seconds to wait before retry number attempt + 1 (exponential backoff, full jitter).
+
+    Full jitter keeps concurrent retries from hitting the host in lockstep.
+    """
+    return random.uniform(0, min(max_backoff, initial_backoff * 2 ** attempt))
+
+
+def _cache_path(url: str) -> Path:
+    return CACHE_DIR / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+
+
+def read_cache(url: str, ttl_seconds: int):
+    """Return cached JSON for url if it's younger than ttl_seconds, else None."""
+    path = _cache_path(url)
+    try:
+        if time.time() - path.stat().st_mtime > ttl_seconds:
+            return None
+        return orjson.loads(path.read_bytes())
+    except (OSError, orjson.JSONDecodeError):
+        return None
+
+
+def write_cache(url: str, data) -> None:
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        # Unique temp name per writer, so concurrent writes of the same url can't rename
+        # each other's half-written file; replace() then swaps the whole file in atomically
+        fd, tmp_name = tempfile.mkstemp(dir=CACHE_DIR, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp_file:
+                tmp_file.write(orjson.dumps(data))
+            os.replace(tmp_name, _cache_path(url))
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp_name)
+            raise
+    except OSError as e:
+        logger.warning("Error writing HTTP cache for %s: %s", url, e)
+
+
+async def get_json_cached(session: aiohttp.ClientSession, url: str, ttl_seconds: int, **kwargs):
+    """
+    GET url and return parsed JSON, serving from the on-disk cache while fresh.
+
+    Fetches go through get_json, so transient failures are retried. Only 200 responses
+    are cached; returns None on a non-retryable non-200 status.
+    Cache file IO runs in a worker thread so it doesn't stall other requests.
+    """
+    if ttl_seconds > 0:
+        cached = await asyncio.to_thread(read_cache, url, ttl_seconds)
+        if cached is not None:
+            return cached
+
+    data = await get_json(session, url, **kwargs)
+    if data is None:
+        return None
+
+    if ttl_seconds > 0:
+        await asyncio.to_thread(write_cache, url, data)
+    return data
@@ -1,46 +1,66 @@
 import aiohttp
 import asyncio
 import datetime as dt
+import time
 from typing import Optional, Dict
-from collections import deque
 
-# Global rate limiter state
+from .http_client import parse_iso, read_cache, read_json, write_cache
+
+# Global rate limiter state: requests are paced one every _REQUEST_INTERVAL seconds,
+# so no 1-second window ever holds more than _MAX_REQUESTS_PER_SECOND of them
 _kalshi_semaphore = asyncio.Semaphore(100)  # Limit concurrent games
-_kalshi_request_times = deque()
-_kalshi_lock = asyncio.Lock()
 _MAX_REQUESTS_PER_SECOND = 20
+_REQUEST_INTERVAL = 1.1 / _MAX_REQUESTS_PER_SECOND  # 10% buffer against timer jitter
+_kalshi_next_slot = 0.0  # time.monotonic() at which the next request may start
+
+# 429 handling: honour Retry-After, but never wait longer than _MAX_RETRY_AFTER seconds
+# at a time or retry a rate-limited request more than _MAX_RATE_LIMIT_RETRIES times
+_MAX_RETRY_AFTER = 30.0
+_MAX_RATE_LIMIT_RETRIES = 4
+
+# Market data of a game whose market has closed never changes, so it's kept on disk across runs
+_CLOSED_MARKET_DISK_TTL = 365 * 24 * 3600
+
+
+async def _wait_for_request_slot():
+    """Reserve the next Kalshi request slot and sleep until it is due.
+
+    Reading and advancing the slot happen without an await in between, so no lock is
+    needed: each caller takes its own slot and only sleeps for its own wait.
+    """
+    global _kalshi_next_slot
+    now = time.monotonic()
+    slot = max(_kalshi_next_slot, now)
+    _kalshi_next_slot = slot + _REQUEST_INTERVAL
+
+    if slot > now:
+        await asyncio.sleep(slot - now)
 
 
 async def _rate_limited_get(session: aiohttp.ClientSession, url: str, timeout: int = 20):
-    """Make a rate-limited GET request to Kalshi API (20 req/sec limit)."""
-    global _kalshi_request_times
-    
-    while True:  # Retry loop for rate limiting
-        async with _kalshi_lock:
-            now = asyncio.get_event_loop().time()
-            
-            # Remove requests older than 1 second
-            while _kalshi_request_times and now - _kalshi_request_times[0] >= 1.0:
-                _kalshi_request_times.popleft()
-            
-            # If we've made MAX requests in the last second, wait
-            if len(_kalshi_request_times) >= _MAX_REQUESTS_PER_SECOND:
-                sleep_time = 1.1 - (now - _kalshi_request_times[0])  # 100ms buffer
-                if sleep_time > 0:
-                    await asyncio.sleep(sleep_time)
-                    continue  # Re-check after sleeping
-            
-            # Record this request BEFORE making it
-            _kalshi_request_times.append(now)
-        
-        # Make the actual request outside the lock
+    """Make a rate-limited GET request to Kalshi API (20 req/sec limit).
+
+    429 responses are retried up to _MAX_RATE_LIMIT_RETRIES times, sleeping for the
+    server's Retry-After capped at _MAX_RETRY_AFTER; after that (429, None) is returned.
+    """
+    for attempt in range(_MAX_RATE_LIMIT_RETRIES + 1):  # Retry loop for rate limiting
+        await _wait_for_request_slot()
+
         try:
             async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
                 if response.status == 429:
+                    if attempt == _MAX_RATE_LIMIT_RETRIES:
+                        print(f"Rate limited (429) for {url.split('/')[-1]}, giving up")
+                        return response.status, None
                     print(f"Rate limited (429) for {url.split('/')[-1]}, retrying...")
-                    await asyncio.sleep(1.0)
+                    try:
+                        retry_after = float(response.headers.get("Retry-After", 1))
+                    except ValueError:
+                        retry_after = 1.0
+                    # A bogus or huge Retry-After must not stall the whole backfill
+                    await asyncio.sleep(min(max(retry_after, 0.0), _MAX_RETRY_AFTER))
                     continue  # Retry the request
-                return response.status, await response.json() if response.status == 200 else None
+                return response.status, await read_json(response) if response.status == 200 else None
         except asyncio.TimeoutError:
             print(f"Timeout for {url.split('/')[-1]}")
             return None, None
@@ -55,6 +75,8 @@ async def get_market_data(session: aiohttp.ClientSession,
                           away_team: str, 
                           home_team: str) -> Dict:
     """Fetch Kalshi market data for a game.
+
+    Results for markets that have already closed are served from the on-disk cache.
     
     Args:
         session: aiohttp session
@@ -63,7 +85,22 @@ async def get_market_data(session: aiohttp.ClientSession,
         away_team: Away team abbreviation
         home_team: Home team abbreviation
     """
-    
+    cache_key = f"kalshi-market-data:{series_ticker}:{date.isoformat()}:{away_team}:{home_team}"
+
+    cached = await asyncio.to_thread(read_cache, cache_key, _CLOSED_MARKET_DISK_TTL)
+    if cached:
+        return cached
+
+    market_data = await _fetch_market_data(session, series_ticker, date, away_team, home_team)
+
+    if market_data and market_data["market_close_ts"] < int(dt.datetime.now().timestamp()):
+        await asyncio.to_thread(write_cache, cache_key, market_data)
+
+    return market_data
+
+
+async def _fetch_market_data(session: aiohttp.ClientSession, series_ticker: str, date: dt.date,
+                             away_team: str, home_team: str) -> Dict:
     async with _kalshi_semaphore:
         base_event_ticker = f"{series_ticker}-{date.strftime('%y%b%d').upper()}{away_team}{home_team}"
         event_ticker = base_event_ticker
@@ -97,20 +134,22 @@ async def get_market_data(session: aiohttp.ClientSession,
                 #         return {}
             
             start_time_str = data["milestones"][0]["start_date"]
-            start_dt = dt.datetime.fromisoformat(start_time_str.replace("Z", "+00:00"))
+            start_dt = parse_iso(start_time_str)
         
             start_ts = int(start_dt.timestamp()) - 60
             
-            # Use the resolved event_ticker for subsequent API calls
+            # Use the resolved event_ticker for subsequent API calls; the candlesticks and
+            # event lookups are independent, so both go out at once
             candlesticks_url = f"https://api.elections.kalshi.com/trade-api/v2/series/{series_ticker}/events/{event_ticker}/candlesticks?start_ts={start_ts}&end_ts={start_ts}&period_interval=1"
-            candlesticks_status, candlesticks_data = await _rate_limited_get(session, candlesticks_url)
+            event_url = f"https://api.elections.kalshi.com/trade-api/v2/events/{event_ticker}"
+            (candlesticks_status, candlesticks_data), (event_status, event_data) = await asyncio.gather(
+                _rate_limited_get(session, candlesticks_url),
+                _rate_limited_get(session, event_url)
+            )
             
             if candlesticks_status != 200 or not candlesticks_data:
                 return {}
             
-            event_url = f"https://api.elections.kalshi.com/trade-api/v2/events/{event_ticker}"
-            event_status, event_data = await _rate_limited_get(session, event_url)
-            
             if event_status != 200 or not event_data:
                 return {}
 
@@ -151,11 +190,11 @@ async def get_market_data(session: aiohttp.ClientSession,
                 return {}
                 
             open_time_str = markets[0]["open_time"]
-            open_dt = dt.datetime.fromisoformat(open_time_str.replace("Z", "+00:00"))
+            open_dt = parse_iso(open_time_str)
             open_ts = int(open_dt.timestamp())
 
             close_time_str = markets[0]["close_time"]
-            close_dt = dt.datetime.fromisoformat(close_time_str.replace("Z", "+00:00"))
+            close_dt = parse_iso(close_time_str)
             close_ts = int(close_dt.timestamp())
 
             result = {
@@ -1,61 +1,250 @@
 import datetime as dt
-from datetime import datetime, timedelta
+from datetime import datetime
 import asyncio
+import logging
+import time
 import aiohttp
-import json
-from collections import deque
+import orjson
+from collections import OrderedDict
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Optional
 
-# Global rate limiting infrastructure
-_polymarket_semaphore = asyncio.Semaphore(100)  # Limit concurrent requests
-_polymarket_request_times = deque()
-_polymarket_lock = asyncio.Lock()
+from .http_client import (RETRY_STATUSES, backoff_delay, get_shared_session, parse_iso, read_cache, read_json,
+                          single_flight, write_cache)
+
+# Errors go through logging so scripts that queue their log records (discover_active_markets)
+# don't write to stdout from the event loop
+logger = logging.getLogger(__name__)
+
+# Global rate limiting infrastructure: a token bucket refilled at _MAX_REQUESTS_PER_SECOND
+# holding at most _MAX_REQUESTS_PER_SECOND tokens. Callers may take it negative, which
+# queues them: each sleeps exactly until its own token has been refilled.
 _MAX_REQUESTS_PER_SECOND = 20
+_tokens = float(_MAX_REQUESTS_PER_SECOND)
+_last_refill = time.monotonic()
+_MAX_ATTEMPTS = 4  # Tries per request for 5xx responses and connection errors
 
-# Simple cache for live markets
-@dataclass
-class MarketCache:
-    data: list[dict]
-    timestamp: datetime
-    ttl_seconds: int = 300  # 5 minutes
+# Concurrent game lookups. 25 is enough to keep the bucket busy without queueing hundreds
+# of tasks on it; bounded so a stray release() can't raise the limit
+_polymarket_semaphore = asyncio.BoundedSemaphore(25)
+
+class _ExpiringLRUCache(OrderedDict):
+    """
+    Mapping for single_flight whose entries expire ttl seconds after they are stored,
+    holding at most max_size of them (least recently read evicted first).
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        super().__init__()
+        self.ttl = ttl
+        self.max_size = max_size
+        self._expires_at: dict = {}
+
+    def get(self, key, default=None):
+        if key not in self or self._expires_at[key] <= time.monotonic():
+            return default
+        self.move_to_end(key)
+        return self[key]
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        self._expires_at[key] = time.monotonic() + self.ttl
+        while len(self) > self.max_size:
+            del self[next(iter(self))]
 
-    def is_expired(self) -> bool:
-        return datetime.now() > self.timestamp + timedelta(seconds=self.ttl_seconds)
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        del self._expires_at[key]
+
+
+# Simple cache for live markets; expires_at is on the time.monotonic() clock
+@dataclass(slots=True)
+class MarketCache:
+    data: tuple[dict, ...]
+    expires_at: float
 
 _market_cache: dict[str, MarketCache] = {}
+_MARKET_CACHE_TTL = 300  # 5 minutes
+
+# In-flight live-market refreshes keyed like _market_cache
+_market_cache_refreshes: dict[str, asyncio.Future] = {}
+
+# Outcome prices assumed for an event market that doesn't list any
+_DEFAULT_OUTCOME_PRICES = ("0.5", "0.5")
+
+# In-flight GETs keyed by (url, params) so concurrent identical requests share one fetch
+_inflight_requests: dict[tuple, asyncio.Future] = {}
+
+# Market metadata keyed by slug; every price/existence lookup for a game reads the same
+# /markets/slug response, so it is kept briefly and shared
+_MARKET_META_TTL = 60
+_MARKET_META_MAX_SIZE = 512
+_market_meta_cache = _ExpiringLRUCache(_MARKET_META_TTL, _MARKET_META_MAX_SIZE)
+
+# Opening prices keyed by (sport, date, away, home); resolved markets never change,
+# so results for closed markets are also kept on disk across runs
+_opening_price_cache: dict[tuple, asyncio.Future] = {}
+_OPENING_PRICE_DISK_TTL = 365 * 24 * 3600
+
+# How far before the wanted moment opening/current price queries reach, so a quiet market
+# still yields its last traded price instead of an empty history
+_PRICE_LOOKBACK_SECONDS = 3600
+
+
+@lru_cache(maxsize=1024)
+def _slug_date(date: dt.date) -> str:
+    """YYYY-MM-DD form of a game date as used in market slugs.
+
+    strftime rather than isoformat() so datetimes also give just the date.
+    """
+    return date.strftime('%Y-%m-%d')
+
+
+async def _acquire_request_token():
+    """Take one token from the request bucket, sleeping until it is refilled if needed.
+
+    The refill and take happen without an await in between, so no lock is needed.
+    """
+    global _tokens, _last_refill
+    now = time.monotonic()
+    _tokens = min(float(_MAX_REQUESTS_PER_SECOND), _tokens + (now - _last_refill) * _MAX_REQUESTS_PER_SECOND)
+    _last_refill = now
+
+    _tokens -= 1
+    if _tokens < 0:
+        await asyncio.sleep(-_tokens / _MAX_REQUESTS_PER_SECOND)
+
+
+async def _rate_limited_get(session: Optional[aiohttp.ClientSession], url: str, **kwargs):
+    """
+    Make a rate-limited GET request to prevent hitting API limits.
+    Concurrent calls for the same url/params share a single in-flight request.
+    With session=None the process-wide pooled session from http_client is used, so
+    every public function here accepts None for its session.
+    """
+    if session is None:
+        session = await get_shared_session()
+
+    if set(kwargs) - {"params"}:
+        return await _rate_limited_get_uncached(session, url, **kwargs)
+
+    params = kwargs.get("params") or {}
+    key = (url, tuple(sorted(params.items())))
 
+    # Shared only while in flight; a finished response isn't kept
+    return await single_flight(_inflight_requests, key,
+                               lambda: _rate_limited_get_uncached(session, url, **kwargs),
+                               keep=lambda _: False)
 
-async def _rate_limited_get(session: aiohttp.ClientSession, url: str, **kwargs):
+
+async def _get_market_meta(session: Optional[aiohttp.ClientSession], slug: str) -> dict:
+    """
+    Get /markets/slug/{slug} metadata, cached for _MARKET_META_TTL seconds.
+    Concurrent callers for the same slug share one fetch; failed fetches are not cached.
+    """
+    market_url = f"https://gamma-api.polymarket.com/markets/slug/{slug}"
+    return await single_flight(_market_meta_cache, slug, lambda: _rate_limited_get(session, market_url),
+                               keep=lambda _: True)
+
+
+async def _rate_limited_get_uncached(session: aiohttp.ClientSession, url: str, **kwargs):
     """
     Make a rate-limited GET request to prevent hitting API limits.
     Enforces max 20 requests per second with retry logic for 429 responses.
+    5xx responses, connection errors and timeouts are retried up to _MAX_ATTEMPTS
+    times with jittered backoff before the error is raised.
     """
+    attempt = 0
     while True:
-        async with _polymarket_lock:
-            now = asyncio.get_event_loop().time()
-
-            # Remove requests older than 1 second
-            while _polymarket_request_times and _polymarket_request_times[0] < now - 1.0:
-                _polymarket_request_times.popleft()
-
-            # Check if we need to wait
-            if len(_polymarket_request_times) >= _MAX_REQUESTS_PER_SECOND:
-                oldest = _polymarket_request_times[0]
-                sleep_time = (oldest + 1.0 - now) + 0.1  # 100ms buffer
-                await asyncio.sleep(sleep_time)
-                continue
+        await _acquire_request_token()
+
+        try:
+            async with session.get(url, **kwargs) as response:
+                if response.status == 429:
+                    await asyncio.sleep(1.0)
+                    continue
+                if response.status not in RETRY_STATUSES or attempt == _MAX_ATTEMPTS - 1:
+                    response.raise_for_status()
+                    return await read_json(response)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == _MAX_ATTEMPTS - 1:
+                raise
 
-            # Record this request
-            _polymarket_request_times.append(now)
+        await asyncio.sleep(backoff_delay(attempt))
+        attempt += 1
 
-        # Make the request outside the lock for better throughput
-        async with session.get(url, **kwargs) as response:
-            if response.status == 429:
-                await asyncio.sleep(1.0)
-                continue
-            response.raise_for_status()
-            return await response.json()
+
+async def _find_game_market(
+    session: Optional[aiohttp.ClientSession],
+    sport: str,
+    date: dt.date,
+    away_team: str,
+    home_team: str
+) -> tuple[str, dict, bool]:
+    """
+    Get the market metadata for a game, returning (slug, data, is_reversed).
+
+    Polymarket sometimes reverses team order in slugs, so the home-away slug is requested
+    when the away-home one doesn't exist (404). Most markets use away-home, so asking for
+    it alone first keeps the usual lookup to one request from the rate-limit bucket.
+    Raises the away-home error if neither slug exists.
+    """
+    sport, away_team, home_team = sport.lower(), away_team.lower(), home_team.lower()
+    day = _slug_date(date)
+    slug = f"{sport}-{away_team}-{home_team}-{day}"  # Normal order
+    try:
+        return slug, await _get_market_meta(session, slug), False
+    except aiohttp.ClientResponseError as e:
+        if e.status != 404:
+            raise
+        not_found = e
+
+    reversed_slug = f"{sport}-{home_team}-{away_team}-{day}"  # Reversed order
+    try:
+        return reversed_slug, await _get_market_meta(session, reversed_slug), True
+    except aiohttp.ClientResponseError as e:
+        if e.status != 404:
+            raise
+        raise not_found from None
+
+
+def _away_home_prices(price_first: float, is_reversed: bool) -> tuple[float, float]:
+    """(away_price, home_price) from the first outcome's price, undoing a reversed slug."""
+    if is_reversed:
+        return 1.0 - price_first, price_first
+    return price_first, 1.0 - price_first
+
+
+def _extract_opening_price(data: dict, is_reversed: bool, history: list[dict]) -> dict:
+    """
+    get_opening_price result from market metadata and its pre-game prices-history window.
+
+    Uses the first price in the minute before game start, or the last one before that
+    minute if nothing traded in it.
+    """
+    start_ts = int(parse_iso(data["gameStartTime"]).timestamp()) - 60
+    opening = next((entry for entry in history if entry["t"] >= start_ts), None) or history[-1]
+    away_price, home_price = _away_home_prices(opening["p"], is_reversed)
+    return {
+        "away_price": away_price,
+        "home_price": home_price,
+        "start_ts": start_ts,
+        "market_open_ts": int(parse_iso(data["createdAt"]).timestamp()),
+        "market_close_ts": int(parse_iso(data["closedTime"]).timestamp())
+    }
+
+
+def _extract_current_price(data: dict, slug: str, is_reversed: bool, history: list[dict], now_ts: int) -> dict:
+    """get_current_price result from market metadata and its recent prices-history window."""
+    away_price, home_price = _away_home_prices(history[-1]["p"], is_reversed)  # Last price in history
+    return {
+        "market_id": data.get("id", slug),  # Use market ID if available, otherwise slug
+        "away_price": away_price,
+        "home_price": home_price,
+        "timestamp": now_ts
+    }
 
 
 """
@@ -73,7 +262,7 @@ information (ie the most import part is right beforre the game start to end)
 
 """
 async def get_opening_price(
-    session: aiohttp.ClientSession,
+    session: Optional[aiohttp.ClientSession],
     sport: str,
     date: dt.date,
     away_team: str,
@@ -84,72 +273,65 @@ async def get_opening_price(
     Opening price is defined as price 60 seconds before game start.
     Returns dict with away_price, home_price, start_ts, market_open_ts or empty dict on error.
 
-    Note: Polymarket sometimes reverses team order in slugs. This function tries both orders.
+    Note: Polymarket sometimes reverses team order in slugs. Both orders are tried (see _find_game_market).
     """
     async with _polymarket_semaphore:
-        # Try normal order first (away-home), then reversed (home-away)
-        team_orders = [
-            (away_team, home_team, False),  # Normal order
-            (home_team, away_team, True)     # Reversed order
-        ]
+        try:
+            slug, data, is_reversed = await _find_game_market(session, sport, date, away_team, home_team)
+            opening_price_url = "https://clob.polymarket.com/prices-history"
 
-        for first_team, second_team, is_reversed in team_orders:
-            try:
-                slug = f"{sport.lower()}-{first_team.lower()}-{second_team.lower()}-{date.strftime('%Y-%m-%d')}"
-                market_url = f"https://gamma-api.polymarket.com/markets/slug/{slug}"
-                opening_price_url = "https://clob.polymarket.com/prices-history"
-
-                # Get market metadata using rate-limited request
-                data = await _rate_limited_get(session, market_url)
-
-                start_date = datetime.fromisoformat(data["gameStartTime"].replace("Z", "+00:00"))
-                start_ts = int(start_date.timestamp()) - 60
-                end_ts = start_ts + 60
-
-                clobIdTokens = json.loads(data["clobTokenIds"])
-                market_open = int(datetime.fromisoformat(data["createdAt"].replace("Z", "+00:00")).timestamp())
-                market_close = int(datetime.fromisoformat(data["closedTime"].replace("Z", "+00:00")).timestamp())
-                queryString = {
-                    "market": clobIdTokens[0],
-                    "startTs": start_ts,
-                    "endTs": end_ts
-                }
-
-                # Get price history using rate-limited request
-                info = await _rate_limited_get(session, opening_price_url, params=queryString)
-
-                # Extract prices
-                price_first = info["history"][0]["p"]
-                price_second = 1.0 - price_first
-
-                # If reversed, swap the prices back to match away/home order
-                if is_reversed:
-                    away_price = price_second
-                    home_price = price_first
-                else:
-                    away_price = price_first
-                    home_price = price_second
-
-                return {
-                    "away_price": away_price,
-                    "home_price": home_price,
-                    "start_ts": start_ts,
-                    "market_open_ts": market_open,
-                    "market_close_ts": market_close
-                }
-            except Exception:
-                # If this order failed and we haven't tried reversed yet, continue to next iteration
-                if not is_reversed:
-                    continue
-                # If both orders failed, return empty dict
-                return {}
+            clobIdTokens = orjson.loads(data["clobTokenIds"])
+            start_ts = int(parse_iso(data["gameStartTime"]).timestamp()) - 60
+            queryString = {
+                "market": clobIdTokens[0],
+                "startTs": start_ts - _PRICE_LOOKBACK_SECONDS,
+                "endTs": start_ts + 60
+            }
 
-        # Should not reach here, but return empty dict as fallback
-        return {}
+            # Get price history using rate-limited request
+            info = await _rate_limited_get(session, opening_price_url, params=queryString)
+
+            return _extract_opening_price(data, is_reversed, info["history"])
+        except Exception:
+            return {}
+
+
+async def get_opening_price_cached(
+    session: Optional[aiohttp.ClientSession],
+    sport: str,
+    date: dt.date,
+    away_team: str,
+    home_team: str
+):
+    """
+    Cached version of get_opening_price.
+
+    Concurrent and repeated calls for the same game share one lookup, and opening prices
+    of closed markets are persisted to the on-disk cache. Failed lookups are not cached.
+    """
+    key = (sport.lower(), date, away_team.lower(), home_team.lower())
+    return await single_flight(_opening_price_cache, key, lambda: _get_opening_price_persisted(session, *key))
+
+
+async def _get_opening_price_persisted(session: Optional[aiohttp.ClientSession], sport: str, date: dt.date,
+                                       away_team: str, home_team: str) -> dict:
+    """get_opening_price backed by the on-disk cache for markets that have closed."""
+    cache_key = f"polymarket-opening-price:{sport}:{date.isoformat()}:{away_team}:{home_team}"
+
+    cached = await asyncio.to_thread(read_cache, cache_key, _OPENING_PRICE_DISK_TTL)
+    if cached:
+        return cached
+
+    market_data = await get_opening_price(session, sport, date, away_team, home_team)
+
+    if market_data and market_data["market_close_ts"] < int(datetime.now().timestamp()):
+        await asyncio.to_thread(write_cache, cache_key, market_data)
+
+    return market_data
 
 
 async def get_current_price(
-    session: aiohttp.ClientSession,
+    session: Optional[aiohttp.ClientSession],
     sport: str,
     date: dt.date,
     away_team: str,
@@ -159,99 +341,61 @@ async def get_current_price(
     Get current price for a Polymarket game market.
     Returns dict with away_price, home_price, market_id, timestamp or empty dict on error.
 
-    Note: Polymarket sometimes reverses team order in slugs. This function tries both orders.
+    Note: Polymarket sometimes reverses team order in slugs. Both orders are tried (see _find_game_market).
     """
     async with _polymarket_semaphore:
-        # Try normal order first (away-home), then reversed (home-away)
-        team_orders = [
-            (away_team, home_team, False),  # Normal order
-            (home_team, away_team, True)     # Reversed order
-        ]
+        try:
+            slug, data, is_reversed = await _find_game_market(session, sport, date, away_team, home_team)
+            price_url = "https://clob.polymarket.com/prices-history"
 
-        for first_team, second_team, is_reversed in team_orders:
-            try:
-                slug = f"{sport.lower()}-{first_team.lower()}-{second_team.lower()}-{date.strftime('%Y-%m-%d')}"
-                market_url = f"https://gamma-api.polymarket.com/markets/slug/{slug}"
-                price_url = "https://clob.polymarket.com/prices-history"
-
-                # Get market metadata using rate-limited request
-                data = await _rate_limited_get(session, market_url)
-
-                clobIdTokens = json.loads(data["clobTokenIds"])
-                market_id = data.get("id", slug)  # Use market ID if available, otherwise slug
-
-                # Get current price (most recent snapshot)
-                now_ts = int(datetime.now().timestamp())
-                start_ts = now_ts - 120  # Look back 2 minutes for latest price
-
-                queryString = {
-                    "market": clobIdTokens[0],
-                    "startTs": start_ts,
-                    "endTs": now_ts
-                }
-
-                # Get price history using rate-limited request
-                info = await _rate_limited_get(session, price_url, params=queryString)
-
-                if not info.get("history"):
-                    # No price data available, return empty dict
-                    return {}
-
-                # Get most recent price
-                price_first = info["history"][-1]["p"]  # Last price in history
-                price_second = 1.0 - price_first
-
-                # If reversed, swap the prices back to match away/home order
-                if is_reversed:
-                    away_price = price_second
-                    home_price = price_first
-                else:
-                    away_price = price_first
-                    home_price = price_second
-
-                return {
-                    "market_id": market_id,
-                    "away_price": away_price,
-                    "home_price": home_price,
-                    "timestamp": now_ts
-                }
-            except Exception:
-                # If this order failed and we haven't tried reversed yet, continue to next iteration
-                if not is_reversed:
-                    continue
-                # If both orders failed, return empty dict
+            clobIdTokens = orjson.loads(data["clobTokenIds"])
+
+            # Get current price (most recent snapshot)
+            now_ts = int(datetime.now().timestamp())
+            start_ts = now_ts - _PRICE_LOOKBACK_SECONDS
+
+            queryString = {
+                "market": clobIdTokens[0],
+                "startTs": start_ts,
+                "endTs": now_ts
+            }
+
+            # Get price history using rate-limited request
+            info = await _rate_limited_get(session, price_url, params=queryString)
+
+            if not info.get("history"):
+                # No price data available, return empty dict
                 return {}
 
-        # Should not reach here, but return empty dict as fallback
-        return {}
+            return _extract_current_price(data, slug, is_reversed, info["history"], now_ts)
+        except Exception:
+            return {}
 
 
-async def get_price_by_slug(session: aiohttp.ClientSession, slug: str) -> dict:
+async def get_price_by_slug(session: Optional[aiohttp.ClientSession], slug: str) -> dict:
     """
     Get current price for a market using its slug directly.
 
     Args:
-        session: aiohttp session
+        session: aiohttp session (None uses the shared pooled session)
         slug: Polymarket slug (e.g., "nfl-giants-broncos-2024-11-08")
 
     Returns:
         Dict with away_price, home_price, timestamp or empty dict on error
     """
     try:
-        market_url = f"https://gamma-api.polymarket.com/markets/slug/{slug}"
         price_url = "https://clob.polymarket.com/prices-history"
 
         # Get market metadata
         async with _polymarket_semaphore:
-            data = await _rate_limited_get(session, market_url)
+            data = await _get_market_meta(session, slug)
 
-            import json
-            clobIdTokens = json.loads(data["clobTokenIds"])
+            clobIdTokens = orjson.loads(data["clobTokenIds"])
 
-            # Get current price (last 2 minutes)
+            # Get current price (latest within the lookback)
             from datetime import datetime
             now_ts = int(datetime.now().timestamp())
-            start_ts = now_ts - 120
+            start_ts = now_ts - _PRICE_LOOKBACK_SECONDS
 
             queryString = {
                 "market": clobIdTokens[0],
@@ -275,12 +419,12 @@ async def get_price_by_slug(session: aiohttp.ClientSession, slug: str) -> dict:
             }
 
     except Exception as e:
-        print(f"Error fetching price for {slug}: {e}")
+        logger.warning("Error fetching price for %s: %s", slug, e)
         return {}
 
 
 async def check_market_exists(
-    session: aiohttp.ClientSession,
+    session: Optional[aiohttp.ClientSession],
     sport: str,
     date: dt.date,
     away_team: str,
@@ -297,58 +441,52 @@ async def check_market_exists(
         - market_open_ts (datetime): Market open time if exists
         - market_close_ts (datetime or None): Market close time if available
             Uses closedTime (precise) for historical markets, endDate (less precise) for active markets
+        - clob_token_id (str or None): CLOB token id of the first outcome, for prices-history
+        - neg_risk (bool or None): Whether the market is a negative-risk market
 
     Or returns dict with exists=False if market doesn't exist.
     """
     async with _polymarket_semaphore:
-        # Try normal order first (away-home), then reversed (home-away)
-        team_orders = [
-            (away_team, home_team),  # Normal order
-            (home_team, away_team)   # Reversed order
-        ]
-
-        for first_team, second_team in team_orders:
+        try:
+            slug, data, _ = await _find_game_market(session, sport, date, away_team, home_team)
+        except Exception:
+            # Neither order exists, market doesn't exist
+            return {"exists": False}
+
+        try:
+            market_id = data.get("id", slug)
+            start_date = parse_iso(data["gameStartTime"])
+            market_open = parse_iso(data["createdAt"]) # startDate
+
+            # Try closedTime first (accurate for historical), fallback to endDate (for active markets)
             try:
-                slug = f"{sport.lower()}-{first_team.lower()}-{second_team.lower()}-{date.strftime('%Y-%m-%d')}"
-                market_url = f"https://gamma-api.polymarket.com/markets/slug/{slug}"
-
-                # Get market metadata using rate-limited request
-                data = await _rate_limited_get(session, market_url)
-
-                # If we got here, market exists
-                market_id = data.get("id", slug)
-                start_date = datetime.fromisoformat(data["gameStartTime"].replace("Z", "+00:00"))
-                market_open = datetime.fromisoformat(data["createdAt"].replace("Z", "+00:00")) # startDate
-
-                # Try closedTime first (accurate for historical), fallback to endDate (for active markets)
+                market_close = parse_iso(data["closedTime"])
+            except KeyError:
+                # Active market - use endDate as fallback (less precise but better than nothing)
                 try:
-                    market_close = datetime.fromisoformat(data["closedTime"].replace("Z", "+00:00"))
+                    market_close = parse_iso(data["endDate"])
                 except KeyError:
-                    # Active market - use endDate as fallback (less precise but better than nothing)
-                    try:
-                        market_close = datetime.fromisoformat(data["endDate"].replace("Z", "+00:00"))
-                    except KeyError:
-                        # No close time available at all
-                        market_close = None
-
-                return {
-                    "exists": True,
-                    "market_id": market_id,
-                    "polymarket_slug": slug,
-                    "game_start_ts": start_date,
-                    "market_open_ts": market_open,
-                    "market_close_ts": market_close  # Can be None for active markets
-                }
-            except Exception:
-                # If normal order failed, try reversed
-                continue
+                    # No close time available at all
+                    market_close = None
 
-        # Both orders failed, market doesn't exist
-        return {"exists": False}
+            clobIdTokens = orjson.loads(data["clobTokenIds"]) if data.get("clobTokenIds") else []
+
+            return {
+                "exists": True,
+                "market_id": market_id,
+                "polymarket_slug": slug,
+                "game_start_ts": start_date,
+                "market_open_ts": market_open,
+                "market_close_ts": market_close,  # Can be None for active markets
+                "clob_token_id": clobIdTokens[0] if clobIdTokens else None,
+                "neg_risk": data.get("negRisk")
+            }
+        except Exception:
+            return {"exists": False}
 
 
 async def get_active_sports_markets(
-    session: aiohttp.ClientSession,
+    session: Optional[aiohttp.ClientSession],
     sport: str,
     limit: int = 50
 ) -> list[dict]:
@@ -356,7 +494,7 @@ async def get_active_sports_markets(
     Fetch all active sports markets for a given league from Polymarket.
 
     Args:
-        session: aiohttp ClientSession
+        session: aiohttp ClientSession (None uses the shared pooled session)
         sport: "nfl" or "nba" (case-insensitive)
         limit: Max results to return
 
@@ -382,7 +520,7 @@ async def get_active_sports_markets(
 
     tag_id = SPORT_TAG_MAP.get(sport.lower())
     if not tag_id:
-        print(f"Unknown sport: {sport}")
+        logger.warning("Unknown sport: %s", sport)
         return []
 
     url = "https://gamma-api.polymarket.com/events"
@@ -401,39 +539,34 @@ async def get_active_sports_markets(
 
         markets = []
         for event in data:
+            # Skip events we can't use before doing any per-event parsing
+            market_list = event.get("markets")
+            start_date_str = event.get("startDate")
+            if not market_list or not start_date_str:
+                continue
+
             slug = event.get("slug", "")
             title = event.get("title", "")
 
             # Extract teams from slug (format: sport-away-home-date)
-            parts = slug.split("-")
-            if len(parts) >= 4:
+            parts = slug.split("-", 3)
+            if len(parts) == 4:
                 away_team = parts[1].replace("_", " ").title()
                 home_team = parts[2].replace("_", " ").title()
             else:
                 # Fallback: parse from title
                 away_team, home_team = _parse_teams_from_title(title)
 
-            # Get first market (main moneyline market)
-            market_list = event.get("markets", [])
-            if not market_list:
-                continue
-
-            market = market_list[0]
-            prices_str = market.get("outcomePrices", '["0.5", "0.5"]')
-            prices = json.loads(prices_str) if isinstance(prices_str, str) else prices_str
-
-            # Parse game date
-            start_date_str = event.get("startDate", "")
-            if start_date_str:
-                game_date = datetime.fromisoformat(start_date_str.replace("Z", "+00:00"))
-            else:
-                continue
+            # First market is the main moneyline market
+            prices = market_list[0].get("outcomePrices", _DEFAULT_OUTCOME_PRICES)
+            if isinstance(prices, str):
+                prices = orjson.loads(prices)
 
             markets.append({
                 "event_id": event.get("id"),
                 "slug": slug,
                 "title": title,
-                "game_date": game_date,
+                "game_date": parse_iso(start_date_str),
                 "away_team": away_team,
                 "home_team": home_team,
                 "away_price": float(prices[0]),
@@ -444,7 +577,7 @@ async def get_active_sports_markets(
         return markets
 
     except Exception as e:
-        print(f"Error fetching {sport} markets: {e}")
+        logger.warning("Error fetching %s markets: %s", sport, e)
         return []
 
 
@@ -460,46 +593,57 @@ def _parse_teams_from_title(title: str) -> tuple[str, str]:
 
 
 async def get_active_sports_markets_cached(
-    session: aiohttp.ClientSession,
+    session: Optional[aiohttp.ClientSession],
     sport: str,
     limit: int = 50,
     force_refresh: bool = False
-) -> list[dict]:
+) -> tuple[dict, ...]:
     """
     Cached version of get_active_sports_markets with 5-minute TTL.
 
     Args:
-        session: aiohttp ClientSession
+        session: aiohttp ClientSession (None uses the shared pooled session)
         sport: "nfl" or "nba"
         limit: Max results to return
         force_refresh: If True, bypass cache
 
     Returns:
-        List of market dicts (same as get_active_sports_markets)
+        Tuple of market dicts (same rows as get_active_sports_markets). The tuple is
+        shared by every caller until it expires, so treat it and its dicts as read-only.
     """
     cache_key = f"{sport.lower()}_{limit}"
 
     # Check cache
-    if not force_refresh and cache_key in _market_cache:
-        cached = _market_cache[cache_key]
-        if not cached.is_expired():
-            return cached.data
+    cached = _market_cache.get(cache_key)
+    if not force_refresh and cached is not None and cached.expires_at > time.monotonic():
+        return cached.data
+
+    # Fetch fresh data, sharing one fetch between concurrent callers
+    return await single_flight(_market_cache_refreshes, cache_key,
+                               lambda: _refresh_active_sports_markets(session, sport, limit, cache_key),
+                               keep=lambda _: False)
 
-    # Fetch fresh data
-    markets = await get_active_sports_markets(session, sport, limit)
+
+async def _refresh_active_sports_markets(
+    session: Optional[aiohttp.ClientSession],
+    sport: str,
+    limit: int,
+    cache_key: str
+) -> tuple[dict, ...]:
+    """Fetch active markets and store them in _market_cache."""
+    markets = tuple(await get_active_sports_markets(session, sport, limit))
 
     # Update cache
     _market_cache[cache_key] = MarketCache(
         data=markets,
-        timestamp=datetime.now(),
-        ttl_seconds=300  # 5 minutes
+        expires_at=time.monotonic() + _MARKET_CACHE_TTL
     )
 
     return markets
 
 
 async def get_price_history(
-    session: aiohttp.ClientSession,
+    session: Optional[aiohttp.ClientSession],
     sport: str,
     date: dt.date,
     away_team: str,
@@ -513,7 +657,7 @@ async def get_price_history(
     Optionally includes filtered history from game_start_ts to market_close_ts.
 
     Args:
-        session: aiohttp ClientSession for making requests
+        session: aiohttp ClientSession for making requests (None uses the shared pooled session)
         sport: Sport type (e.g., "NBA", "NFL", "MLB")
         date: Game date
         away_team: Away team name (Polymarket format)
@@ -535,92 +679,67 @@ async def get_price_history(
 
         Returns empty dict {} if market doesn't exist or error occurs.
 
-    Note: Polymarket sometimes reverses team order in slugs. This function tries both orders.
+    Note: Polymarket sometimes reverses team order in slugs. Both orders are tried (see _find_game_market).
     """
     async with _polymarket_semaphore:
-        # Try normal order first (away-home), then reversed (home-away)
-        team_orders = [
-            (away_team, home_team, False),  # Normal order
-            (home_team, away_team, True)     # Reversed order
-        ]
+        try:
+            slug, data, is_reversed = await _find_game_market(session, sport, date, away_team, home_team)
+            price_history_url = "https://clob.polymarket.com/prices-history"
 
-        for first_team, second_team, is_reversed in team_orders:
-            try:
-                slug = f"{sport.lower()}-{first_team.lower()}-{second_team.lower()}-{date.strftime('%Y-%m-%d')}"
-                market_url = f"https://gamma-api.polymarket.com/markets/slug/{slug}"
-                price_history_url = "https://clob.polymarket.com/prices-history"
-
-                # Get market metadata using rate-limited request
-                data = await _rate_limited_get(session, market_url)
-
-                # Extract timestamps
-                game_start_dt = datetime.fromisoformat(data["gameStartTime"].replace("Z", "+00:00"))
-                market_open_dt = datetime.fromisoformat(data["createdAt"].replace("Z", "+00:00"))
-                market_close_dt = datetime.fromisoformat(data["closedTime"].replace("Z", "+00:00"))
-
-                game_start_ts = int(game_start_dt.timestamp())
-                market_open_ts = int(market_open_dt.timestamp())
-                market_close_ts = int(market_close_dt.timestamp())
-
-                # Extract clob token for price queries
-                clobIdTokens = json.loads(data["clobTokenIds"])
-                market_token = clobIdTokens[0]
-
-                # Fetch full price history (market open to close)
-                queryString = {
-                    "market": market_token,
-                    "startTs": market_open_ts,
-                    "endTs": market_close_ts
-                }
-
-                # Get price history using rate-limited request
-                history_data = await _rate_limited_get(session, price_history_url, params=queryString)
-
-                # Process full history data
-                full_history = []
-                for entry in history_data.get("history", []):
-                    price_first = entry["p"]
-                    price_second = 1.0 - price_first
-                    timestamp = entry["t"]
-
-                    # Handle price reversal if team order was reversed
-                    if is_reversed:
-                        away_price = price_second
-                        home_price = price_first
-                    else:
-                        away_price = price_first
-                        home_price = price_second
-
-                    full_history.append({
-                        "timestamp": timestamp,
-                        "away_price": away_price,
-                        "home_price": home_price
-                    })
-
-                # Build result
-                result = {
-                    "full_history": full_history,
-                    "market_open_ts": market_open_ts,
-                    "market_close_ts": market_close_ts,
-                    "game_start_ts": game_start_ts
-                }
-
-                # If requested, filter for game interval (in-memory, no extra API call)
-                if include_game_interval:
-                    game_history = [
-                        entry for entry in full_history
-                        if entry["timestamp"] >= game_start_ts
-                    ]
-                    result["game_history"] = game_history
-
-                return result
-
-            except Exception:
-                # If this order failed and we haven't tried reversed yet, continue
-                if not is_reversed:
-                    continue
-                # If both orders failed, return empty dict
-                return {}
+            # Extract timestamps
+            game_start_dt = parse_iso(data["gameStartTime"])
+            market_open_dt = parse_iso(data["createdAt"])
+            market_close_dt = parse_iso(data["closedTime"])
+
+            game_start_ts = int(game_start_dt.timestamp())
+            market_open_ts = int(market_open_dt.timestamp())
+            market_close_ts = int(market_close_dt.timestamp())
+
+            # Extract clob token for price queries
+            clobIdTokens = orjson.loads(data["clobTokenIds"])
+            market_token = clobIdTokens[0]
+
+            # Fetch full price history (market open to close)
+            queryString = {
+                "market": market_token,
+                "startTs": market_open_ts,
+                "endTs": market_close_ts
+            }
+
+            # Get price history using rate-limited request
+            history_data = await _rate_limited_get(session, price_history_url, params=queryString)
+
+            # Process full history data; the reversal check is hoisted out of the per-entry
+            # work since it is the same for the whole market
+            history = history_data.get("history", [])
+            if is_reversed:
+                full_history = [
+                    {"timestamp": entry["t"], "away_price": 1.0 - entry["p"], "home_price": entry["p"]}
+                    for entry in history
+                ]
+            else:
+                full_history = [
+                    {"timestamp": entry["t"], "away_price": entry["p"], "home_price": 1.0 - entry["p"]}
+                    for entry in history
+                ]
+
+            # Build result
+            result = {
+                "full_history": full_history,
+                "market_open_ts": market_open_ts,
+                "market_close_ts": market_close_ts,
+                "game_start_ts": game_start_ts
+            }
+
+            # If requested, filter for game interval (in-memory, no extra API call)
+            if include_game_interval:
+                game_history = [
+                    entry for entry in full_history
+                    if entry["timestamp"] >= game_start_ts
+                ]
+                result["game_history"] = game_history
+
+            return result
 
-        # Should not reach here, but return empty dict as fallback
-        return {}
\ No newline at end of file
+        except Exception:
+            return {}
@@ -1,13 +1,24 @@
 #!/usr/bin/env python3
 """Test script to verify team mapping logic."""
+import contextlib
+import io
 import sys
 from pathlib import Path
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+from sqlalchemy import select
+
 from app.db import SessionLocal, NFLGameFeatures
-from app.services.knn_service import find_similar_games
+
+
+# Stat columns compared between the query game and its similar games
+STAT_COLUMNS = [
+    NFLGameFeatures.home_yardsPerPlay, NFLGameFeatures.away_yardsPerPlay,
+    NFLGameFeatures.home_thirdDownEff, NFLGameFeatures.away_thirdDownEff,
+    NFLGameFeatures.home_firstDowns, NFLGameFeatures.away_firstDowns,
+]
 
 
 def test_mapping():
@@ -16,11 +27,19 @@ def test_mapping():
 
     try:
         # Get a sample game
-        sample_game = db.query(NFLGameFeatures).first()
+        sample_game = db.execute(
+            select(NFLGameFeatures.game_id, NFLGameFeatures.game_date,
+                   NFLGameFeatures.away_team, NFLGameFeatures.home_team, *STAT_COLUMNS).limit(1)
+        ).first()
         if not sample_game:
             print("No NFL games found in database")
             return False
 
+        # Load the KNN stack (NumPy, scikit-learn) only once there's a game to search, and
+        # fit the NFL model up front
+        from app.services.knn_service import find_similar_games, warm_cache
+        warm_cache(db, 'NFL')
+
         print("=" * 80)
         print("TESTING TEAM MAPPING")
         print("=" * 80)
@@ -51,11 +70,17 @@ def test_mapping():
             print("No similar games found")
             return False
 
+        # Fetch all similar games' details in one query
+        similar_games = {
+            g.game_id: g for g in db.execute(
+                select(NFLGameFeatures.game_id, *STAT_COLUMNS).where(
+                    NFLGameFeatures.game_id.in_([r['game_id'] for r in results])
+                )
+            )
+        }
+
         for i, result in enumerate(results, 1):
-            # Fetch the similar game details
-            similar_game = db.query(NFLGameFeatures).filter_by(
-                game_id=result['game_id']
-            ).first()
+            similar_game = similar_games.get(result['game_id'])
 
             if not similar_game:
                 continue
@@ -122,5 +147,10 @@ def test_mapping():
 
 
 if __name__ == "__main__":
-    success = test_mapping()
+    # Buffer the report and write it in one go, so terminal output doesn't slow the searches
+    report = io.StringIO()
+    with contextlib.redirect_stdout(report):
+        success = test_mapping()
+    sys.stdout.write(report.getvalue())
+    sys.stdout.flush()
     sys.exit(0 if success else 1)